@@ -0,0 +1,59 @@
+"""Awesome-oscillator parameter sweep: per-combination pandas loop against ``sweep``.
+
+    python -m benchmarks.bench_backtest --tickers 100 --years 10 --jobs 4
+
+The loop runs ``awe_osc`` and the backtest with pandas for every ticker and
+(fast, slow) pair, as one would extend 13_financial_stats.
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.timing import timed
+from reporting.backtest import sweep
+
+
+def awe_osc(high, low, fast=5, slow=34):
+    median_price = 0.5 * (high + low)
+    return median_price.rolling(fast).mean() - median_price.rolling(slow).mean()
+
+
+def with_pandas(high, low, close, grid, cost):
+    rows = []
+    returns = close.pct_change(fill_method=None).fillna(0)
+    for fast, slow in grid:
+        for col in close.columns:
+            ao = awe_osc(high[col], low[col], fast, slow)
+            position = (ao > ao.shift()).astype(int).shift(1).fillna(0)
+            net = position * returns[col] - cost * position.diff().abs().fillna(position.abs())
+            equity = (1 + net).cumprod()
+            rows.append((fast, slow, col, equity.iloc[-1] - 1, (equity / equity.cummax() - 1).min()))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tickers', type=int, default=100)
+    parser.add_argument('--years', type=int, default=10)
+    parser.add_argument('--jobs', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    n_dates = 252 * args.years
+    rng = np.random.default_rng(0)
+    close = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, .02, (n_dates, args.tickers)), axis=0)))
+    spread = close * rng.uniform(0, .02, close.shape)
+    high, low = close + spread, close - spread
+    grid = [(f, s) for f in range(3, 13) for s in range(20, 60, 4)]
+
+    print(f'{n_dates} dates x {args.tickers} tickers x {len(grid)} parameter pairs')
+    for name, func in [('pandas loop', lambda: with_pandas(high, low, close, grid, .001)),
+                       ('sweep, 1 process', lambda: sweep(high, low, close, grid, .001, n_jobs=1)),
+                       (f'sweep, {args.jobs or "all"} processes', lambda: sweep(high, low, close, grid, .001,
+                                                                             n_jobs=args.jobs))]:
+        print(f'{name:24} {timed(func, repeat=1):8.2f} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""Correlation matrix of many assets: ``DataFrame.corr`` against ``correlation``.
+
+    python -m benchmarks.bench_correlation --assets 3000 --dates 1260
+
+pandas is only timed up to ``--pandas-max`` assets, it loops over all pairs
+of columns.
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.timing import timed
+from reporting.correlation import correlation, ledoit_wolf
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--assets', type=int, default=3000)
+    parser.add_argument('--dates', type=int, default=1260)
+    parser.add_argument('--pandas-max', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    factors = rng.normal(0, .01, (args.dates, 10))
+    returns = factors @ rng.normal(0, 1, (10, args.assets)) + rng.normal(0, .02, (args.dates, args.assets))
+    gappy = returns.copy()
+    gappy[rng.random(gappy.shape) < .01] = np.nan
+
+    print(f'{args.dates} dates x {args.assets} assets')
+    n = min(args.assets, args.pandas_max)
+    runs = [(f'pandas corr, {n} assets', lambda: pd.DataFrame(returns[:, :n]).corr(), 1),
+            ('correlation float64', lambda: correlation(returns), args.repeat),
+            ('correlation float32', lambda: correlation(returns, dtype=np.float32), args.repeat),
+            ('correlation, 1% missing', lambda: correlation(gappy), args.repeat),
+            ('ledoit_wolf float64', lambda: ledoit_wolf(returns), args.repeat)]
+    for name, func, repeat in runs:
+        print(f'{name:28} {timed(func, repeat):8.3f} s')
+
+
+if __name__ == '__main__':
+    main()
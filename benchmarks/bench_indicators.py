@@ -0,0 +1,56 @@
+"""Rolling indicators for many tickers: pandas ``rolling`` against ``reporting.indicators``.
+
+    python -m benchmarks.bench_indicators --tickers 2000 --years 20
+
+Computes SMA_50, SMA_200, the rolling std and max over 20 days, an EMA and the
+awesome oscillator of 13_financial_stats for every ticker.
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.timing import timed
+from reporting.indicators import awesome_oscillator, ema, rolling_max, rolling_mean, rolling_std
+
+
+def with_pandas(close, high, low):
+    median = (high + low) / 2
+    return (close.rolling(50).mean(), close.rolling(200).mean(), close.rolling(20).std(),
+            close.rolling(20).max(), close.ewm(span=20).mean(),
+            median.rolling(5).mean() - median.rolling(34).mean())
+
+
+def with_kernels(close, high, low):
+    return (rolling_mean(close, [50, 200]), rolling_std(close, 20), rolling_max(close, 20),
+            ema(close, span=20), awesome_oscillator(high, low))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tickers', type=int, default=2000)
+    parser.add_argument('--years', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    n_dates = 252 * args.years
+    rng = np.random.default_rng(0)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, .02, (n_dates, args.tickers)), axis=0))
+    close[rng.random(close.shape) < .001] = np.nan
+    spread = close * rng.uniform(0, .02, close.shape)
+    high, low = close + spread, close - spread
+    frames = [pd.DataFrame(a) for a in (close, high, low)]
+
+    cells = close.size
+    print(f'{n_dates} dates x {args.tickers} tickers ({cells / 1e6:.1f} M prices)')
+    runs = [('pandas rolling/ewm', lambda: with_pandas(*frames)),
+            ('indicators, DataFrames', lambda: with_kernels(*frames)),
+            ('indicators, arrays', lambda: with_kernels(close, high, low))]
+    for name, func in runs:
+        t = timed(func, args.repeat)
+        print(f'{name:24} {t:8.3f} s {cells / t / 1e6:10.1f} M prices/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""Throughput of ``compute_returns`` on a wide price panel.
+
+    python -m benchmarks.bench_returns --assets 5000 --years 20
+
+Compares the engine with the column-by-column pandas version of
+13_financial_stats (``pct_change`` and ``np.log(...).diff()`` per column) and
+with the same calls on the whole DataFrame.
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.timing import timed
+from reporting.returns import compute_returns
+
+
+def per_column(df):
+    out = {}
+    for col in df.columns:
+        out[f'{col}_discrete'] = df[col].pct_change(fill_method=None)
+        out[f'{col}_log'] = np.log(df[col]).diff()
+    return out
+
+
+def whole_frame(df):
+    return df.pct_change(fill_method=None), np.log(df).diff()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--assets', type=int, default=5000)
+    parser.add_argument('--years', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    n_dates = 252 * args.years
+    rng = np.random.default_rng(0)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, .02, (n_dates, args.assets)), axis=0))
+    prices[rng.random(prices.shape) < .001] = np.nan
+    df = pd.DataFrame(prices)
+
+    cells = prices.size
+    print(f'{n_dates} dates x {args.assets} assets ({cells / 1e6:.1f} M prices)')
+    runs = [('pandas, per column', lambda: per_column(df)),
+            ('pandas, whole frame', lambda: whole_frame(df)),
+            ('compute_returns float64', lambda: compute_returns(prices, ('simple', 'log'))),
+            ('compute_returns float32', lambda: compute_returns(prices, ('simple', 'log'), dtype=np.float32)),
+            ('compute_returns, all kinds', lambda: compute_returns(prices, ('simple', 'log', 'excess', 'cumulative'),
+                                                                   rf=1e-4))]
+    for name, func in runs:
+        t = timed(func, args.repeat)
+        print(f'{name:28} {t:8.3f} s {cells / t / 1e6:10.1f} M prices/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""Throughput of ``scale_array`` against ``StandardScaler.transform``.
+
+    python -m benchmarks.bench_scaling --n 100000000 --dtype float32
+
+Needs about four times ``n`` values of memory for the float64 run, because
+``scaler.transform`` copies the input and allocates its result.
+"""
+
+import argparse
+
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+
+from benchmarks.timing import timed
+from reporting.scaling import scale_array
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--n', type=int, default=10**8)
+    parser.add_argument('--dtype', default='float64', choices=['float32', 'float64'])
+    parser.add_argument('--threads', type=int, default=None)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    x = rng.normal(2, 5, args.n).astype(args.dtype)
+    scaler = StandardScaler().fit(x[:1_000_000].reshape(-1, 1))
+    out = np.empty_like(x)
+
+    t_sklearn = timed(lambda: scaler.transform(x.reshape(-1, 1)), args.repeat)
+    t_fused = timed(lambda: scale_array(x, scaler.mean_, scaler.scale_, out=out,
+                                        n_threads=args.threads), args.repeat)
+    t_single = timed(lambda: scale_array(x, scaler.mean_, scaler.scale_, out=out,
+                                         n_threads=1), args.repeat)
+
+    gb = x.nbytes / 1e9
+    print(f'{args.n:,} {args.dtype} values ({gb:.2f} GB)')
+    for name, t in [('scaler.transform', t_sklearn),
+                    ('scale_array, 1 thread', t_single),
+                    ('scale_array', t_fused)]:
+        print(f'{name:25} {t:8.3f} s {args.n / t / 1e6:10.1f} M values/s')
+
+
+if __name__ == '__main__':
+    main()
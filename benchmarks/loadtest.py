@@ -0,0 +1,74 @@
+"""Measure requests per second of a running Dash app.
+
+Start the app once with the development server (``app.run_server()``) and
+once with ``python -m reporting.serve``, then point this script at both:
+
+    python -m benchmarks.loadtest http://127.0.0.1:8050 http://127.0.0.1:8051
+
+Every worker thread requests the page, its layout and its callback graph in a
+loop, the same requests a browser makes when the app is opened.
+"""
+
+import argparse
+import statistics
+import threading
+import time
+import urllib.request
+
+
+PATHS = ['/', '/_dash-layout', '/_dash-dependencies']
+
+
+def _worker(base_url, deadline, latencies, errors, lock):
+    while time.perf_counter() < deadline:
+        for path in PATHS:
+            start = time.perf_counter()
+            try:
+                request = urllib.request.Request(base_url.rstrip('/') + path,
+                                                 headers={'Accept-Encoding': 'gzip'})
+                with urllib.request.urlopen(request, timeout=10) as response:
+                    response.read()
+            except Exception:
+                with lock:
+                    errors.append(path)
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+
+def run(base_url, duration=10, concurrency=16):
+    """Hammer ``base_url`` for ``duration`` seconds and return summary numbers."""
+    latencies, errors, lock = [], [], threading.Lock()
+    deadline = time.perf_counter() + duration
+    threads = [threading.Thread(target=_worker, args=(base_url, deadline, latencies, errors, lock))
+               for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    latencies.sort()
+    return {'url': base_url,
+            'requests': len(latencies),
+            'errors': len(errors),
+            'req_per_s': len(latencies) / duration,
+            'mean_ms': 1000 * statistics.fmean(latencies) if latencies else float('nan'),
+            'p95_ms': 1000 * latencies[int(.95 * (len(latencies) - 1))] if latencies else float('nan')}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('urls', nargs='+')
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--concurrency', type=int, default=16)
+    args = parser.parse_args(argv)
+
+    print(f"{'url':40} {'req/s':>10} {'mean ms':>10} {'p95 ms':>10} {'errors':>8}")
+    for url in args.urls:
+        res = run(url, duration=args.duration, concurrency=args.concurrency)
+        print(f"{res['url']:40} {res['req_per_s']:10.1f} {res['mean_ms']:10.1f} "
+              f"{res['p95_ms']:10.1f} {res['errors']:8d}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,13 @@
+"""Timing helper shared by the ``bench_*`` scripts."""
+
+import time
+
+
+def timed(func, repeat=3):
+    """Best wall-clock time of ``repeat`` calls of ``func``, in seconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
@@ -0,0 +1,6 @@
+"""Helper modules used alongside the course notebooks.
+
+The notebooks import from the submodules directly, e.g.
+``from reporting.clientside import transform_callback``. Nothing is imported
+here so that a notebook only needs the dependencies of the helpers it uses.
+"""
@@ -0,0 +1,59 @@
+"""Array helpers shared by the indicator, CAPM, correlation and incremental modules.
+
+Everything here works along the first axis (dates) of a (dates,) or
+(dates x columns) array and leaves labels to ``wrap``.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def as_float(x, dtype=float):
+    return np.asarray(x, dtype=dtype)
+
+
+def wrap(like, values):
+    """``values`` with the index and columns (or name) of ``like``."""
+    if isinstance(like, pd.DataFrame):
+        return pd.DataFrame(values, index=like.index, columns=like.columns)
+    if isinstance(like, pd.Series):
+        return pd.Series(values, index=like.index, name=like.name)
+    return values
+
+
+def ewm_alpha(span, alpha):
+    """Smoothing factor from ``alpha`` or, as in pandas, ``2 / (span + 1)``."""
+    if alpha is None:
+        if span is None:
+            raise ValueError('either span or alpha is required')
+        alpha = 2 / (span + 1)
+    return alpha
+
+
+def padded_cumsum(x, dtype=float):
+    """Cumulative sum with a leading row of zeros."""
+    c = np.zeros((len(x) + 1,) + x.shape[1:], dtype=dtype)
+    np.cumsum(x, axis=0, out=c[1:])
+    return c
+
+
+def nan_counts(nan):
+    """Running count of missing values, or None if there are none."""
+    return padded_cumsum(nan, dtype=np.int32) if nan.any() else None
+
+
+def blank_windows(out, w, counts):
+    """Blank the first w - 1 rows and every window with a missing value."""
+    out[:w - 1] = np.nan
+    if counts is not None:
+        out[w - 1:][counts[w:] != counts[:-w]] = np.nan
+    return out
+
+
+def window_sums(x, windows, nan, counts):
+    """Sums over the last w rows for every window length w."""
+    csum = padded_cumsum(x if counts is None else np.where(nan, 0, x))
+    for w in windows:
+        sums = np.empty(x.shape)
+        np.subtract(csum[w:], csum[:-w], out=sums[w - 1:])
+        yield w, sums
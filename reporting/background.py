@@ -0,0 +1,92 @@
+"""Run slow Dash callbacks in background processes.
+
+A normal callback runs inside the Flask worker that received the request, so
+refitting a model or reloading a CSV blocks every other user of that worker.
+Background callbacks are handed to a job queue on disk (``diskcache``) and run
+in separate processes; the worker only polls for the result.
+
+    from reporting.background import background_callback, data_version, progress_outputs
+
+    @background_callback(app,
+        Output('outgraph', 'figure'),
+        Input('company_dd', 'value'),
+        progress=progress_outputs('load_progress'),
+        running=[(Output('company_dd', 'disabled'), True, False)],
+        cache_by=[data_version('data/dji_sector_prices.csv')])
+    def make_outgraph(set_progress, sym):
+        ...
+        set_progress((1, 2))
+        ...
+
+If the same callback is triggered again while a job is still running (the user
+picked another company), dash terminates the old job before starting the new
+one. Results are cached per combination of input values and the return values
+of the ``cache_by`` functions, so ``data_version`` invalidates the cache as
+soon as one of the data files changes.
+"""
+
+import os
+
+from dash import DiskcacheManager, html
+from dash.dependencies import Output
+
+
+DEFAULT_CACHE_DIR = '.dash_cache'
+
+_managers = {}
+
+
+def _unversioned():
+    return 0
+
+
+def disk_manager(cache_dir=DEFAULT_CACHE_DIR, expire=3600, cache_by=None):
+    """Return a (shared) diskcache backed manager for ``cache_dir``.
+
+    ``expire`` is the number of seconds cached results are kept, ``cache_by``
+    a list of functions whose return values become part of the cache key.
+    """
+    import diskcache
+
+    cache_by = tuple(cache_by or [_unversioned])
+    key = (os.path.abspath(cache_dir), expire, cache_by)
+    if key not in _managers:
+        cache = diskcache.Cache(cache_dir)
+        _managers[key] = DiskcacheManager(cache, cache_by=list(cache_by), expire=expire)
+    return _managers[key]
+
+
+def data_version(*paths):
+    """Return a function suitable for ``cache_by`` that changes with the files."""
+    def version():
+        return tuple(os.stat(path).st_mtime_ns for path in paths)
+    return version
+
+
+def progress_bar(id, **kwargs):
+    """``html.Progress`` element to be filled through ``progress_outputs(id)``."""
+    return html.Progress(id=id, value='0', max='1', **kwargs)
+
+
+def progress_outputs(id):
+    """Outputs for ``set_progress((value, max))`` calls on a ``progress_bar``."""
+    return [Output(id, 'value'), Output(id, 'max')]
+
+
+def background_callback(app, *dependencies, manager=None, progress=None, running=None,
+                        cancel=None, cache_by=None, **kwargs):
+    """Like ``app.callback`` but the function runs as a background job.
+
+    With ``progress`` the function receives ``set_progress`` as its first
+    argument. ``cancel`` lists additional inputs that abort a running job,
+    ``running`` holds ``(Output, value_while_running, value_when_done)``
+    tuples, e.g. to disable a button during the computation. ``cache_by`` is
+    only used when no ``manager`` is given.
+    """
+    return app.callback(*dependencies,
+                        background=True,
+                        manager=manager or disk_manager(cache_by=cache_by),
+                        progress=progress,
+                        running=running,
+                        cancel=cancel,
+                        **kwargs)
@@ -0,0 +1,144 @@
+"""Backtests of signal strategies for many tickers and parameter sets at once.
+
+13_financial_stats derives ``shift_diff`` and ``signal`` from ``awe_osc`` but
+never evaluates them. ``backtest`` takes signals of shape (dates, tickers)
+or (parameter sets, dates, tickers), holds the signal of each bar from the next
+bar on and computes positions, turnover, transaction costs, returns, equity
+and drawdowns in whole-array operations. ``sweep`` runs a (fast, slow) grid
+of awesome-oscillator strategies across processes:
+
+    from reporting.backtest import ao_signals, backtest, summarize, sweep
+
+    signals = ao_signals(df.High, df.Low, [(5, 34)])       # as ao.signal
+    result = backtest(df.Close, signals, cost=0.001)
+    summarize(result, params=[(5, 34)])
+
+    grid = [(f, s) for f in range(3, 15) for s in range(20, 60, 2)]
+    scores = sweep(prices.High, prices.Low, prices.Close, grid, cost=0.001)
+    scores.sort_values('sharpe').tail()
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from reporting.indicators import rolling_mean
+
+
+def _as_panel(x):
+    x = np.asarray(x, dtype=float)
+    return x[:, None] if x.ndim == 1 else x
+
+
+def ao_signals(high, low, params):
+    """Long (1) / flat (0) signals ``awe_osc(...) > awe_osc(...).shift()``.
+
+    ``params`` is a sequence of (fast, slow) pairs; the result has shape
+    (len(params), dates, tickers). All window lengths come from one pass of
+    ``rolling_mean`` over the median price.
+    """
+    params = [tuple(sorted(p)) for p in params]
+    median_price = 0.5 * (_as_panel(high) + _as_panel(low))
+    sma = rolling_mean(median_price, sorted({w for p in params for w in p}))
+    signals = np.zeros((len(params),) + median_price.shape)
+    for i, (fast, slow) in enumerate(params):
+        ao = sma[fast] - sma[slow]
+        # comparisons with a missing value are False, as in the notebook
+        signals[i, 1:] = ao[1:] > ao[:-1]
+    return signals
+
+
+def backtest(prices, signals, cost=0.0, lag=1):
+    """Positions, costs, returns, equity and drawdowns of the ``signals``.
+
+    ``prices`` has shape (dates,) or (dates, tickers). ``signals`` holds the
+    target position of every bar, with the same shape or with a leading axis
+    of parameter sets; missing values mean no position. The position on bar
+    t is the signal of bar t - ``lag``. ``cost`` is charged per unit of
+    position traded, e.g. 0.001 for 10 basis points.
+
+    Returns a dict of (parameter sets, dates, tickers) arrays: 'position',
+    'turnover', 'returns' (net of costs), 'equity' (starting at 1) and
+    'drawdown'. Without a parameter axis in ``signals`` it has length 1.
+    """
+    single = np.ndim(prices) == 1
+    P = _as_panel(prices)
+    S = np.nan_to_num(np.asarray(signals, dtype=float))
+    if single:
+        S = S[..., None]
+    if S.ndim == 2:
+        S = S[None]
+    if S.ndim != 3 or S.shape[1:] != P.shape:
+        raise ValueError(f'signals of shape {np.shape(signals)} do not match prices of shape {np.shape(prices)}')
+    R = np.zeros_like(P)
+    R[1:] = P[1:] / P[:-1] - 1
+    np.nan_to_num(R, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
+
+    position = np.zeros_like(S)
+    position[..., lag:, :] = S[..., :-lag, :] if lag else S
+    turnover = np.abs(np.diff(position, axis=-2, prepend=0))
+    returns = position * R - cost * turnover
+    equity = np.cumprod(1 + returns, axis=-2)
+    drawdown = equity / np.maximum.accumulate(equity, axis=-2) - 1
+    return {'position': position, 'turnover': turnover, 'returns': returns,
+            'equity': equity, 'drawdown': drawdown}
+
+
+def summarize(result, params=None, tickers=None, periods_per_year=252):
+    """Total return, Sharpe ratio, maximum drawdown and number of trades.
+
+    One row per parameter set and ticker; ``params`` and ``tickers`` label
+    the rows.
+    """
+    returns = result['returns']
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sharpe = returns.mean(axis=1) / returns.std(axis=1, ddof=1) * np.sqrt(periods_per_year)
+    stats = {'total_return': result['equity'][:, -1] - 1,
+             'sharpe': sharpe,
+             'max_drawdown': result['drawdown'].min(axis=1),
+             'trades': (result['turnover'] > 0).sum(axis=1)}
+
+    n_params, _, n_tickers = returns.shape
+    labels = [tuple(p) if np.ndim(p) else (p,) for p in (range(n_params) if params is None else params)]
+    tickers = range(n_tickers) if tickers is None else tickers
+    names = ['fast', 'slow'] if params is not None and len(labels[0]) == 2 else [None] * len(labels[0])
+    index = pd.MultiIndex.from_tuples([(*p, t) for p in labels for t in tickers], names=names + ['ticker'])
+    return pd.DataFrame({k: v.ravel() for k, v in stats.items()}, index=index)
+
+
+_worker = {}
+
+
+def _init(high, low, close, cost, tickers):
+    _worker.update(high=high, low=low, close=close, cost=cost, tickers=tickers)
+
+
+def _run(params):
+    signals = ao_signals(_worker['high'], _worker['low'], params)
+    result = backtest(_worker['close'], signals, cost=_worker['cost'])
+    return summarize(result, params=params, tickers=_worker['tickers'])
+
+
+def sweep(high, low, close, params, cost=0.0, n_jobs=None, chunk_size=8):
+    """``summarize`` of the awesome-oscillator strategy for every (fast, slow)
+    pair in ``params``.
+
+    The grid is split into chunks of ``chunk_size`` pairs, which bounds the
+    memory of each backtest, and the chunks are run in ``n_jobs`` processes.
+    """
+    tickers = close.columns if isinstance(close, pd.DataFrame) else None
+    high, low, close = (_as_panel(a) for a in (high, low, close))
+    params = [tuple(sorted(p)) for p in params]
+    chunks = [params[i:i + chunk_size] for i in range(0, len(params), chunk_size)]
+    n_jobs = min(n_jobs or os.cpu_count() or 1, len(chunks))
+
+    if n_jobs == 1:
+        _init(high, low, close, cost, tickers)
+        tables = [_run(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(n_jobs, initializer=_init,
+                                 initargs=(high, low, close, cost, tickers)) as pool:
+            tables = list(pool.map(_run, chunks))
+    return pd.concat(tables)
@@ -0,0 +1,102 @@
+"""CAPM regressions of many assets on one market index.
+
+13_financial_stats_CAPM stops at the return moments of a single stock.
+``capm`` regresses the excess returns of every asset on the excess market
+return at once: with one regressor the least-squares fit is closed-form,
+``beta = cov(r, m) / var(m)``, so all assets need only a handful of column
+sums. ``rolling_beta`` gets the betas of every window from cumulative sums:
+
+    from reporting.capm import capm, rolling_beta
+
+    table = capm(returns, returns['^GSPC'], rf=rf_daily)   # one row per asset
+    table[['alpha', 'beta', 'beta_t', 'r2']]
+
+    betas = rolling_beta(returns, returns['^GSPC'], window=252)
+
+Missing values are dropped per asset: each regression uses the dates on
+which both the asset and the market have a return.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from reporting._arrays import blank_windows, nan_counts, window_sums, wrap
+
+
+def _excess(returns, market, rf):
+    Y = np.asarray(returns, dtype=float)
+    if Y.ndim == 1:
+        Y = Y[:, None]
+    rf = np.asarray(rf, dtype=float)
+    m = np.asarray(market, dtype=float) - rf
+    Y = Y - (rf[:, None] if rf.ndim == 1 else rf)
+    valid = ~np.isnan(Y) & ~np.isnan(m)[:, None]
+    # beta is unchanged by shifting either variable; the deviations from the
+    # means avoid cancellation in Sxx and Sxy
+    m_shift = np.nanmean(m)
+    y_shift = np.nanmean(Y, axis=0)
+    X = np.where(valid, (m - m_shift)[:, None], 0)
+    Y = np.where(valid, Y - y_shift, 0)
+    return X, Y, valid, m_shift, y_shift
+
+
+def _labels(returns):
+    if isinstance(returns, pd.DataFrame):
+        return returns.columns
+    if isinstance(returns, pd.Series):
+        return [returns.name]
+    return None
+
+
+def capm(returns, market, rf=0.0):
+    """Alpha, beta, their standard errors, t statistics and p-values, R² and
+    the number of observations for every asset.
+
+    ``returns`` holds simple returns (dates x assets), ``market`` the index
+    returns and ``rf`` the per-period risk-free rate, scalar or one value
+    per date. Alpha is per period, like the returns.
+    """
+    X, Y, valid, m_shift, y_shift = _excess(returns, market, rf)
+    n = valid.sum(axis=0).astype(float)
+    sx, sy = X.sum(axis=0), Y.sum(axis=0)
+    sxx, sxy, syy = (X * X).sum(axis=0), (X * Y).sum(axis=0), (Y * Y).sum(axis=0)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        x_mean, y_mean = sx / n, sy / n
+        Sxx = sxx - sx * x_mean
+        Sxy = sxy - sx * y_mean
+        Syy = syy - sy * y_mean
+        beta = Sxy / Sxx
+        # intercept in the unshifted variables
+        alpha = y_mean + y_shift - beta * (x_mean + m_shift)
+        dof = n - 2
+        sse = np.maximum(Syy - beta * Sxy, 0)
+        s2 = np.where(dof > 0, sse / dof, np.nan)
+        beta_se = np.sqrt(s2 / Sxx)
+        alpha_se = np.sqrt(s2 * (1 / n + (x_mean + m_shift) ** 2 / Sxx))
+        table = pd.DataFrame({'alpha': alpha, 'beta': beta,
+                              'alpha_se': alpha_se, 'beta_se': beta_se,
+                              'alpha_t': alpha / alpha_se, 'beta_t': beta / beta_se,
+                              'r2': 1 - sse / Syy, 'n': n.astype(int)},
+                             index=_labels(returns))
+    table.insert(6, 'alpha_p', 2 * stats.t.sf(np.abs(table.alpha_t), dof))
+    table.insert(7, 'beta_p', 2 * stats.t.sf(np.abs(table.beta_t), dof))
+    return table
+
+
+def rolling_beta(returns, market, window, rf=0.0):
+    """Beta of every asset over the last ``window`` dates, dates x assets.
+
+    A window with a missing asset or market return gives a missing beta,
+    as ``returns.rolling(window).cov(market) / market.rolling(window).var()``.
+    """
+    X, Y, valid, _, _ = _excess(returns, market, rf)
+    missing = ~valid
+    counts = nan_counts(missing)
+    sx, sy, sxx, sxy = (sums for a in (X, Y, X * X, X * Y)
+                        for _, sums in window_sums(a, [window], missing, counts))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        beta = (sxy - sx * sy / window) / (sxx - sx * sx / window)
+    beta = blank_windows(beta, window, counts)
+    return wrap(returns, beta[:, 0] if isinstance(returns, pd.Series) else beta)
@@ -0,0 +1,165 @@
+"""Run trivial Dash callbacks in the browser instead of on the Flask server.
+
+Callbacks such as ``div_outext`` in 11_dash_II only turn a string or a number
+into another string. Registered with ``app.callback`` every keystroke is sent
+to the server and back. Registered as a clientside callback the same transform
+runs as JavaScript in the browser and the server is not involved at all.
+
+    from reporting.clientside import TIMES_TWO_JS, transform_callback
+
+    @transform_callback(app,
+        Output('outext', 'children'),
+        Input('inum', 'value'),
+        js=TIMES_TWO_JS,
+        cases=[('',), (None,), (1,), (21,), (2.5,), (-0.1,)])
+    def div_outext(num):
+        if num is None:
+            return 'times two: '
+        return f'times two: {num*2}'
+
+``TIMES_TWO_JS`` handles what ``dcc.Input(type='number')`` sends: ``''``
+before anything is typed, None once the box is cleared, and fractional
+numbers, which Python prints as ``5.0`` where JavaScript would print ``5``.
+
+The Python function stays the reference implementation. The fallback to it is
+manual: it is registered as a server callback when no JavaScript is given or
+``clientside=False`` is passed. Whether both agree is checked outside the
+serving process, in a notebook cell or test that has node installed:
+``check_transform(div_outext)`` runs both on the ``cases`` given to the
+decorator and returns the mismatches (see ``compare_callback``).
+"""
+
+import json
+import shutil
+import subprocess
+
+from dash.dependencies import Input, Output, State
+
+
+TIMES_TWO_JS = """function(num) {
+    if (num === null || num === '') {
+        return 'times two: ';
+    }
+    const out = num * 2;
+    // a fractional input reaches Python as a float, printed as 5.0, not 5
+    return 'times two: ' + (Number.isInteger(out) && !Number.isInteger(num) ? out.toFixed(1) : String(out));
+}"""
+
+
+# stands in for dash.no_update / window.dash_clientside.no_update when
+# results of both paths are compared
+NO_UPDATE = {'__no_update__': True}
+
+_NODE_TEMPLATE = """
+const window = {dash_clientside: {no_update: %(no_update)s}};
+const dash_clientside = window.dash_clientside;
+const fn = (%(js)s);
+const results = %(cases)s.map(function (args) {
+    try {
+        const out = fn.apply(null, args);
+        return {ok: true, value: out === undefined ? null : out};
+    } catch (err) {
+        return {ok: false, error: String(err)};
+    }
+});
+process.stdout.write(JSON.stringify(results));
+"""
+
+
+def _split_dependencies(dependencies):
+    outputs = [d for d in dependencies if isinstance(d, Output)]
+    inputs = [d for d in dependencies if isinstance(d, (Input, State))]
+    return outputs, inputs
+
+
+def _normalize(value):
+    """Bring a Python callback result into the shape JSON.stringify produces."""
+    if type(value).__name__ == 'NoUpdate':
+        return NO_UPDATE
+    if isinstance(value, (tuple, list)):
+        return [_normalize(el) for el in value]
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    if isinstance(value, float) and value.is_integer():
+        # JavaScript does not distinguish 4.0 from 4
+        return int(value)
+    return value
+
+
+def run_js(js, cases, node='node', timeout=30):
+    """Call the JavaScript function ``js`` with every argument tuple in ``cases``.
+
+    Returns one ``{'ok': bool, 'value'/'error': ...}`` dict per case.
+    """
+    node_bin = shutil.which(node)
+    if node_bin is None:
+        raise RuntimeError(f"'{node}' was not found, the JavaScript side can not be checked")
+
+    script = _NODE_TEMPLATE % {'no_update': json.dumps(NO_UPDATE),
+                               'js': js,
+                               'cases': json.dumps([list(args) for args in cases])}
+    proc = subprocess.run([node_bin, '-e', script], capture_output=True,
+                          text=True, timeout=timeout)
+    if proc.returncode != 0:
+        raise RuntimeError(f'JavaScript could not be evaluated:\n{proc.stderr}')
+    return json.loads(proc.stdout)
+
+
+def compare_callback(func, js, cases, node='node'):
+    """Run ``cases`` through the Python callback and its JavaScript version.
+
+    Returns a list of ``(args, python_result, js_result)`` for every case where
+    the two differ, both results as ``{'ok': True, 'value': ...}`` or
+    ``{'ok': False, 'error': ...}``; an empty list means both paths agree. A
+    Python exception only matches a JavaScript exception. The Python function
+    gets the arguments as the browser sends them, e.g. ``2`` for ``2.0``.
+    """
+    cases = [tuple(args) for args in cases]
+    js_results = run_js(js, cases, node=node)
+
+    mismatches = []
+    for args, js_res in zip(cases, js_results):
+        try:
+            py_res = {'ok': True, 'value': _normalize(func(*_normalize(args)))}
+        except Exception as err:
+            py_res = {'ok': False, 'error': repr(err)}
+        if js_res['ok']:
+            js_res = {'ok': True, 'value': _normalize(js_res['value'])}
+
+        if py_res != js_res and (py_res['ok'] or js_res['ok']):
+            mismatches.append((args, py_res, js_res))
+    return mismatches
+
+
+def transform_callback(app, *dependencies, js=None, cases=None, clientside=True):
+    """Decorator registering a pure transform as a clientside callback.
+
+    ``dependencies`` are the ``Output``/``Input``/``State`` objects one would
+    pass to ``app.callback``. ``js`` is the source of an equivalent JavaScript
+    function taking the same arguments. ``cases`` (a list of argument tuples)
+    are stored for ``check_transform``; nothing is run at registration time,
+    so the serving host needs no node. Without ``js`` or with
+    ``clientside=False`` the Python function is registered as a server
+    callback instead; nothing switches to it automatically.
+    """
+    outputs, inputs = _split_dependencies(dependencies)
+
+    def decorator(func):
+        use_js = clientside and js is not None
+        if use_js:
+            app.clientside_callback(js, *outputs, *inputs)
+        else:
+            app.callback(*outputs, *inputs)(func)
+
+        func.js = js
+        func.cases = [tuple(args) for args in cases or ()]
+        func.clientside = use_js
+        return func
+    return decorator
+
+
+def check_transform(func, node='node'):
+    """``compare_callback`` for a function decorated with ``transform_callback``."""
+    if func.js is None:
+        raise ValueError(f'{func.__name__} has no JavaScript implementation')
+    return compare_callback(func, func.js, func.cases, node=node)
@@ -0,0 +1,121 @@
+"""Choosing the number of clusters on large data.
+
+12_sklearn_2024 fits ``KMeans`` for one ``n_cluster`` after the other and
+scores each fit with ``silhouette_samples``, which needs the distances between
+all pairs of points. ``kmeans_sweep`` fits the candidate ``k`` in parallel
+processes that all read the same shared-memory copy of ``X``, and scores each
+fit with ``silhouette_estimate``: the exact silhouette of a random sample of
+points against all points, computed in blocks of bounded size.
+
+    from reporting.clustering import kmeans_sweep
+
+    scores = kmeans_sweep(X, range(2, 7))
+    scores.plot(x='k', y='silhouette')
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+
+def _sq_norms(X):
+    return np.einsum('ij,ij->i', X, X)
+
+
+def silhouette_estimate(X, labels, sample_size=2000, chunk_size=256, block_size=65536,
+                        random_state=None):
+    """Mean silhouette coefficient of ``sample_size`` randomly drawn points.
+
+    Each sampled point is compared with all points of ``X``; distances are
+    computed for ``chunk_size`` x ``block_size`` pairs at a time, so memory
+    does not depend on the number of points. With ``sample_size=None`` all
+    points are used, which gives ``silhouette_score`` exactly.
+    """
+    X = np.asarray(X, dtype=float)
+    labels = np.asarray(labels)
+    n = len(X)
+    rng = np.random.default_rng(random_state)
+    sample = np.arange(n) if sample_size is None or sample_size >= n else rng.choice(n, sample_size, replace=False)
+
+    # sort by cluster so that every cluster is a contiguous run of rows
+    order = np.argsort(labels, kind='stable')
+    X_sorted, labels_sorted = X[order], labels[order]
+    clusters, starts, counts = np.unique(labels_sorted, return_index=True, return_counts=True)
+    cluster_index = np.searchsorted(clusters, labels_sorted)
+    norms_sorted = _sq_norms(X_sorted)
+
+    scores = np.empty(len(sample))
+    for c0 in range(0, len(sample), chunk_size):
+        rows = sample[c0:c0 + chunk_size]
+        A = X[rows]
+        a_norms = _sq_norms(A)
+        sums = np.zeros((len(rows), len(clusters)))
+
+        for b0 in range(0, n, block_size):
+            b1 = min(b0 + block_size, n)
+            sq = a_norms[:, None] + norms_sorted[None, b0:b1] - 2 * A @ X_sorted[b0:b1].T
+            dist = np.sqrt(np.maximum(sq, 0))
+            # start of every cluster segment inside this block
+            seg = np.unique(np.r_[0, starts[(starts > b0) & (starts < b1)] - b0])
+            sums[:, cluster_index[b0 + seg]] += np.add.reduceat(dist, seg, axis=1)
+
+        own = np.searchsorted(clusters, labels[rows])
+        own_count = counts[own]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            a = sums[np.arange(len(rows)), own] / (own_count - 1)
+            mean_other = sums / counts
+        mean_other[np.arange(len(rows)), own] = np.inf
+        b = mean_other.min(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            s = (b - a) / np.maximum(a, b)
+        # points alone in their cluster score 0, as in sklearn
+        scores[c0:c0 + len(rows)] = np.where(own_count > 1, np.nan_to_num(s), 0)
+    return scores.mean()
+
+
+_worker = {}
+
+
+def _attach(name, shape, dtype):
+    shm = shared_memory.SharedMemory(name=name)
+    _worker['shm'] = shm
+    _worker['X'] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _fit_k(k, sample_size, random_state, kmeans_kwargs):
+    from sklearn.cluster import KMeans
+
+    X = _worker['X']
+    kmeans = KMeans(n_clusters=k, random_state=random_state, **kmeans_kwargs).fit(X)
+    silhouette = silhouette_estimate(X, kmeans.labels_, sample_size=sample_size,
+                                     random_state=random_state)
+    return {'k': k, 'inertia': kmeans.inertia_, 'silhouette': silhouette}
+
+
+def kmeans_sweep(X, ks=range(2, 7), n_jobs=None, sample_size=2000, random_state=42, **kmeans_kwargs):
+    """Fit ``KMeans`` for every ``k`` in ``ks`` in parallel and score the fits.
+
+    Returns a DataFrame with ``k``, ``inertia`` and ``silhouette``. ``X`` is
+    copied once into shared memory; the worker processes use it without
+    copying. ``kmeans_kwargs`` are passed to ``KMeans`` (default
+    ``n_init='auto'``).
+    """
+    X = np.ascontiguousarray(X, dtype=float)
+    ks = list(ks)
+    kmeans_kwargs.setdefault('n_init', 'auto')
+    n_jobs = min(n_jobs or os.cpu_count() or 1, len(ks))
+
+    shm = shared_memory.SharedMemory(create=True, size=max(X.nbytes, 1))
+    try:
+        np.ndarray(X.shape, dtype=X.dtype, buffer=shm.buf)[:] = X
+        with ProcessPoolExecutor(n_jobs, initializer=_attach,
+                                 initargs=(shm.name, X.shape, X.dtype.str)) as pool:
+            futures = [pool.submit(_fit_k, k, sample_size, random_state, kmeans_kwargs) for k in ks]
+            results = [future.result() for future in futures]
+    finally:
+        shm.close()
+        shm.unlink()
+    return pd.DataFrame(results)
@@ -0,0 +1,229 @@
+"""Covariance and correlation matrices of many columns.
+
+07_graphics plots ``corr_df.corr()`` of BankChurners and the financial
+chapters need the same for asset returns. ``DataFrame.corr`` loops over all
+pairs of columns; here the whole matrix is one product ``X.T @ X`` of the
+centered data, in float64 or float32:
+
+    from reporting.correlation import correlation, ledoit_wolf
+
+    corr = correlation(corr_df)                   # same as corr_df.corr()
+    corr32 = correlation(returns, dtype=np.float32)
+    cov, shrinkage = ledoit_wolf(returns)         # as sklearn.covariance.ledoit_wolf
+
+Missing values are handled pairwise, as in pandas: every pair of columns
+uses the rows where both are present. This takes four matrix products
+instead of one. ``RollingCovariance`` and ``EWMCovariance`` update the
+matrices with every new row.
+"""
+
+import numpy as np
+import pandas as pd
+
+from reporting._arrays import as_float, ewm_alpha
+
+
+def _prepare(X, dtype):
+    values = as_float(X, dtype)
+    if values.ndim == 1:
+        values = values[:, None]
+    return values
+
+
+def _wrap_matrix(like, values):
+    """Label a (columns x columns) result with the columns of ``like``."""
+    if isinstance(like, pd.DataFrame):
+        return pd.DataFrame(values, index=like.columns, columns=like.columns)
+    return values
+
+
+def _pairwise(X, ddof, min_periods):
+    """Covariances and the variances of each column on the rows shared with
+    every other column, all (columns x columns)."""
+    valid = ~np.isnan(X)
+    if valid.all():
+        Xc = X - X.mean(axis=0)
+        n = len(X)
+        cov = Xc.T @ Xc
+        if n < max(min_periods, ddof + 1):
+            cov[:] = np.nan
+        else:
+            cov /= n - ddof
+        var = np.diag(cov)
+        var_i, var_j = np.broadcast_to(var[:, None], cov.shape), np.broadcast_to(var[None, :], cov.shape)
+        return cov, var_i, var_j, np.full(cov.shape, n)
+
+    mean = np.nanmean(X, axis=0)
+    Z = np.where(valid, X - mean, 0).astype(X.dtype)
+    M = valid.astype(X.dtype)
+    n = M.T @ M                     # rows where i and j are present
+    S = Z.T @ M                     # S[i, j]: sum of x_i on those rows
+    Q = Z.T @ Z                     # sum of x_i * x_j
+    SS = (Z * Z).T @ M              # sum of x_i ** 2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = (Q - S * S.T / n) / (n - ddof)
+        var_i = (SS - S * S / n) / (n - ddof)
+    cov[n < max(min_periods, ddof + 1)] = np.nan
+    return cov, var_i, var_i.T, n
+
+
+def covariance(X, ddof=1, min_periods=1, dtype=np.float64):
+    """Covariance matrix of the columns of ``X``, ``DataFrame.cov``."""
+    values = _prepare(X, dtype)
+    cov, _, _, _ = _pairwise(values, ddof, min_periods)
+    return _wrap_matrix(X, cov)
+
+
+def correlation(X, min_periods=1, dtype=np.float64):
+    """Pearson correlation matrix of the columns of ``X``, ``DataFrame.corr``."""
+    values = _prepare(X, dtype)
+    cov, var_i, var_j, _ = _pairwise(values, 1, min_periods)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        corr = cov / np.sqrt(var_i * var_j)
+    np.clip(corr, -1, 1, out=corr)
+    # constant columns have no correlation, not even with themselves
+    diagonal = np.diagonal(corr).copy()
+    np.fill_diagonal(corr, np.where(np.isnan(diagonal), np.nan, 1))
+    return _wrap_matrix(X, corr)
+
+
+def ledoit_wolf(X, dtype=np.float64):
+    """Ledoit-Wolf shrunk covariance and the shrinkage coefficient.
+
+    The same estimate as ``sklearn.covariance.ledoit_wolf``: the empirical
+    covariance (ddof=0) pulled towards ``mu * I``, ``mu`` the mean variance.
+    Rows with a missing value are dropped.
+    """
+    values = _prepare(X, dtype)
+    values = values[~np.isnan(values).any(axis=1)]
+    n_samples, n_features = values.shape
+    Xc = values - values.mean(axis=0)
+
+    XtX = Xc.T @ Xc
+    emp_cov = XtX / n_samples
+    X2 = Xc * Xc
+    emp_cov_trace = X2.sum(axis=0) / n_samples
+    mu = emp_cov_trace.sum() / n_features
+    beta_ = (X2.T @ X2).sum()
+    delta_ = (XtX * XtX).sum() / n_samples ** 2
+    beta = (beta_ / n_samples - delta_) / (n_features * n_samples)
+    delta = (delta_ - 2 * mu * emp_cov_trace.sum() + n_features * mu ** 2) / n_features
+    beta = min(beta, delta)
+    shrinkage = 0.0 if beta == 0 else float(beta / delta)
+
+    shrunk = (1 - shrinkage) * emp_cov
+    shrunk.flat[::n_features + 1] += shrinkage * mu
+    return _wrap_matrix(X, shrunk), shrinkage
+
+
+def _to_correlation(cov):
+    d = np.sqrt(np.diag(cov))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        corr = cov / np.outer(d, d)
+    return np.clip(corr, -1, 1)
+
+
+class RollingCovariance:
+    """Covariance of the last ``window`` rows, updated in O(columns²) per row.
+
+    Keeps the rows in a ring buffer with their sum and sum of outer products.
+    Rows need to be complete.
+    """
+
+    def __init__(self, window, n_columns, dtype=np.float64):
+        self.window = window
+        self.buffer = np.zeros((window, n_columns), dtype=dtype)
+        self.pos = 0
+        self.count = 0
+        self.total = np.zeros(n_columns, dtype=dtype)
+        self.cross = np.zeros((n_columns, n_columns), dtype=dtype)
+
+    @classmethod
+    def from_history(cls, X, window, dtype=np.float64):
+        values = _prepare(X, dtype)[-window:]
+        rolling = cls(window, values.shape[1], dtype)
+        rolling.buffer[:len(values)] = values
+        rolling.count = len(values)
+        rolling.pos = len(values) % window
+        rolling._recompute()
+        return rolling
+
+    def _recompute(self):
+        rows = self.buffer[:self.count]
+        self.total = rows.sum(axis=0)
+        self.cross = rows.T @ rows
+
+    def update(self, x):
+        x = np.asarray(x, dtype=self.buffer.dtype)
+        if self.count == self.window:
+            old = self.buffer[self.pos]
+            self.total -= old
+            self.cross -= np.outer(old, old)
+        else:
+            self.count += 1
+        self.buffer[self.pos] = x
+        self.total += x
+        self.cross += np.outer(x, x)
+        self.pos = (self.pos + 1) % self.window
+        if self.pos == 0:
+            # once per lap: drop the rounding error of the running sums
+            self._recompute()
+        return self
+
+    @property
+    def covariance(self):
+        n = self.count
+        if n < 2:
+            return np.full(self.cross.shape, np.nan)
+        return (self.cross - np.outer(self.total, self.total) / n) / (n - 1)
+
+    @property
+    def correlation(self):
+        return _to_correlation(self.covariance)
+
+
+class EWMCovariance:
+    """Exponentially weighted mean and covariance, one rank-one update per row.
+
+    ``mean = (1 - alpha) * mean + alpha * x`` and
+    ``cov = (1 - alpha) * (cov + alpha * d d')`` with ``d = x - mean`` before
+    the update, as in RiskMetrics. Rows need to be complete.
+    """
+
+    def __init__(self, n_columns, span=None, alpha=None, dtype=np.float64):
+        self.alpha = ewm_alpha(span, alpha)
+        self.count = 0
+        self.mean = np.zeros(n_columns, dtype=dtype)
+        self.covariance = np.zeros((n_columns, n_columns), dtype=dtype)
+
+    @classmethod
+    def from_history(cls, X, span=None, alpha=None, dtype=np.float64):
+        values = _prepare(X, dtype)
+        ewm = cls(values.shape[1], span, alpha, dtype)
+        if len(values):
+            # the recursion gives the weighted (ddof=0) moments with weights
+            # alpha * (1 - alpha) ** age, the first row (1 - alpha) ** age
+            decay = 1 - ewm.alpha
+            weights = ewm.alpha * decay ** np.arange(len(values) - 1, -1, -1)
+            weights[0] = decay ** (len(values) - 1)
+            ewm.mean = weights @ values
+            centered = values - ewm.mean
+            ewm.covariance = (centered * weights[:, None]).T @ centered
+            ewm.count = len(values)
+        return ewm
+
+    def update(self, x):
+        x = np.asarray(x, dtype=self.mean.dtype)
+        if self.count == 0:
+            self.mean[:] = x
+        else:
+            d = x - self.mean
+            self.mean += self.alpha * d
+            self.covariance += self.alpha * np.outer(d, d)
+            self.covariance *= 1 - self.alpha
+        self.count += 1
+        return self
+
+    @property
+    def correlation(self):
+        return _to_correlation(self.covariance)
@@ -0,0 +1,147 @@
+"""Linked brushing over several scatter plots without rebuilding the figures.
+
+The three-graph example in tests.ipynb creates all three ``px.scatter``
+figures again on every selection and intersects the selected points from the
+``customdata`` of every selected point. ``Crossfilter`` keeps every column
+sorted once; a brushed range is then found with two binary searches and the
+selections of all graphs are combined with ``&`` on boolean masks.
+
+    xf = Crossfilter(df, ['Col 1', 'Col 2', 'Col 3', 'Col 4', 'Col 5', 'Col 6'])
+    graphs = {'g1': ('Col 1', 'Col 2'), 'g2': ('Col 3', 'Col 4'), 'g3': ('Col 5', 'Col 6')}
+
+    app.layout = html.Div([dcc.Graph(id=g, figure=scatter_figure(df, *cols))
+                           for g, cols in graphs.items()])
+
+    @app.callback([Output(g, 'figure') for g in graphs],
+                  [Input(g, 'selectedData') for g in graphs])
+    def callback(*selections):
+        return crossfilter_patches(xf, graphs, selections)
+
+The figures are created once for the layout; the callback only sends the new
+``selectedpoints`` and selection rectangles back as ``dash.Patch`` objects.
+"""
+
+import numpy as np
+
+
+class Crossfilter:
+    """Per-column sorted indices and range masks over one DataFrame.
+
+    The object is read-only after construction, so one instance can be
+    shared by all callbacks and threads; the current selections are passed
+    in as a dict of masks.
+    """
+
+    def __init__(self, df, columns):
+        self.n = len(df)
+        self.columns = list(columns)
+        self._values = {}
+        self._order = {}
+        for col in self.columns:
+            values = np.asarray(df[col])
+            order = np.argsort(values, kind='stable')
+            self._order[col] = order
+            self._values[col] = values[order]
+
+    def range_mask(self, column, low, high):
+        """Boolean mask of rows with ``low <= df[column] <= high``."""
+        values = self._values[column]
+        start = np.searchsorted(values, low, side='left')
+        stop = np.searchsorted(values, high, side='right')
+        mask = np.zeros(self.n, dtype=bool)
+        mask[self._order[column][start:stop]] = True
+        return mask
+
+    def brush_mask(self, ranges):
+        """Rows inside all ``{column: (low, high)}`` ranges, None for no ranges."""
+        if not ranges:
+            return None
+        mask = None
+        for column, (low, high) in ranges.items():
+            col_mask = self.range_mask(column, min(low, high), max(low, high))
+            mask = col_mask if mask is None else np.bitwise_and(mask, col_mask, out=mask)
+        return mask
+
+    def rows_mask(self, positions):
+        """Mask of explicit row positions, e.g. from a lasso."""
+        mask = np.zeros(self.n, dtype=bool)
+        mask[np.asarray(positions, dtype=np.intp)] = True
+        return mask
+
+    def mask(self, filters, exclude=None):
+        """Rows passing all masks in ``filters`` ({key: mask or None}),
+        optionally ignoring the filter ``exclude``; None if no filter is active."""
+        result = None
+        for key, mask in filters.items():
+            if key != exclude and mask is not None:
+                result = mask.copy() if result is None else np.bitwise_and(result, mask, out=result)
+        return result
+
+    def selectedpoints(self, filters, exclude=None):
+        """Positions of the selected rows, as expected by plotly's ``selectedpoints``.
+
+        None when no filter is active, which plotly reads as "nothing selected".
+        """
+        mask = self.mask(filters, exclude)
+        return None if mask is None else np.flatnonzero(mask)
+
+
+def scatter_figure(df, x_col, y_col):
+    """Initial figure for one graph, styled like ``get_figure`` in tests.ipynb.
+
+    ``Scattergl`` keeps a million markers responsive in the browser.
+    """
+    import plotly.graph_objects as go
+
+    fig = go.Figure(go.Scattergl(x=df[x_col], y=df[y_col], mode='markers',
+                                 marker={'color': 'rgba(0, 116, 217, 0.7)'},
+                                 unselected={'marker': {'opacity': 0.3}}))
+    fig.update_layout(margin={'l': 20, 'r': 0, 'b': 15, 't': 5}, dragmode='select',
+                      hovermode=False, xaxis_title=x_col, yaxis_title=y_col)
+    return fig
+
+
+def selection_ranges(selected_data, x_col, y_col):
+    """Turn a box selection from ``selectedData`` into ``{column: (low, high)}``."""
+    if not selected_data or not selected_data.get('range'):
+        return None
+    ranges = selected_data['range']
+    return {x_col: tuple(ranges['x']), y_col: tuple(ranges['y'])}
+
+
+def crossfilter_patches(xf, graphs, selections):
+    """Combine the selections of all graphs and return one ``dash.Patch`` per graph.
+
+    ``graphs`` maps graph ids to their ``(x_col, y_col)``, ``selections`` are
+    the ``selectedData`` values in the same order. Each patch replaces the
+    ``selectedpoints`` of the first trace and the selection rectangle
+    (``layout.shapes``) of its figure.
+    """
+    from dash import Patch
+
+    filters = {}
+    all_ranges = []
+    for (key, (x_col, y_col)), selected_data in zip(graphs.items(), selections):
+        ranges = selection_ranges(selected_data, x_col, y_col)
+        if ranges is None and selected_data and selected_data.get('points'):
+            # lasso selections have no range, only the selected points
+            filters[key] = xf.rows_mask([p['pointIndex'] for p in selected_data['points']])
+        else:
+            filters[key] = xf.brush_mask(ranges)
+        all_ranges.append(ranges)
+
+    selected = xf.selectedpoints(filters)
+    if selected is not None:
+        selected = selected.tolist()
+    patches = []
+    for (x_col, y_col), ranges in zip(graphs.values(), all_ranges):
+        patch = Patch()
+        patch['data'][0]['selectedpoints'] = selected
+        if ranges:
+            (x0, x1), (y0, y1) = ranges[x_col], ranges[y_col]
+            patch['layout']['shapes'] = [{'type': 'rect', 'x0': x0, 'x1': x1, 'y0': y0, 'y1': y1,
+                                          'line': {'width': 1, 'dash': 'dot', 'color': 'darkgrey'}}]
+        else:
+            patch['layout']['shapes'] = []
+        patches.append(patch)
+    return patches
@@ -0,0 +1,67 @@
+"""Counts and sums per category combination, computed once.
+
+``px.histogram(credit_cards, x='Marital_Status', color='Gender')`` puts every
+row of BankChurners into the figure and lets plotly.js do the counting in the
+browser. ``SummaryCube`` groups the rows by all categorical columns once;
+every bar chart or count histogram over these columns is then built from a
+few aggregated rows instead:
+
+    from reporting.cube import SummaryCube
+
+    cube = SummaryCube(credit_cards, measures=['Credit_Limit'])
+    cube.histogram(x='Marital_Status', color='Gender')
+    cube.histogram(x='Education_Level', facet_col='Card_Category')
+    cube.bar(x='Income_Category', y='Credit_Limit', agg='mean')
+"""
+
+import pandas as pd
+
+
+class SummaryCube:
+    """Row counts and sums of ``measures`` per combination of ``dims``.
+
+    ``dims`` defaults to all object and category columns of ``df``.
+    """
+
+    def __init__(self, df, dims=None, measures=()):
+        if dims is None:
+            dims = list(df.select_dtypes(include=['object', 'category']).columns)
+        self.dims = list(dims)
+        self.measures = list(measures)
+
+        grouped = df.groupby(self.dims, observed=True, dropna=False)
+        cube = grouped[self.measures].sum() if self.measures else pd.DataFrame(index=grouped.size().index)
+        cube['count'] = grouped.size()
+        self.cube = cube.reset_index()
+
+    def totals(self, *by, where=None):
+        """Counts and sums rolled up to the columns ``by``.
+
+        ``where`` restricts the rows first, e.g. ``{'Gender': 'F'}`` or
+        ``{'Card_Category': ['Gold', 'Platinum']}``.
+        """
+        cube = self.cube
+        for col, value in (where or {}).items():
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            cube = cube[cube[col].isin(values)]
+        columns = self.measures + ['count']
+        by = [col for col in by if col is not None]
+        if not by:
+            return cube[columns].sum().to_frame().T.astype(cube[columns].dtypes)
+        return cube.groupby(by, observed=True, dropna=False, sort=False)[columns].sum().reset_index()
+
+    def bar(self, x, y='count', agg='sum', color=None, facet_col=None, facet_row=None,
+            where=None, **kwargs):
+        """``px.bar`` of ``count`` or of the sum/mean of a measure."""
+        import plotly.express as px
+
+        data = self.totals(x, color, facet_col, facet_row, where=where)
+        if y != 'count' and agg == 'mean':
+            data[y] = data[y] / data['count']
+        return px.bar(data, x=x, y=y, color=color, facet_col=facet_col, facet_row=facet_row, **kwargs)
+
+    def histogram(self, x, color=None, facet_col=None, facet_row=None, where=None, **kwargs):
+        """Same picture as ``px.histogram`` over the raw rows for a categorical ``x``."""
+        kwargs.setdefault('labels', {'count': 'count'})
+        return self.bar(x, 'count', color=color, facet_col=facet_col, facet_row=facet_row,
+                        where=where, **kwargs)
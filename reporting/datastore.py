@@ -0,0 +1,200 @@
+"""Share one copy of a dataset between all processes serving a dashboard.
+
+``pd.read_csv('data/dji_sector_prices.csv')`` at the top of an app module is
+executed once per worker process, so every worker holds its own copy of the
+data. Here the data is written once as an Arrow IPC file and every process
+memory-maps it. The operating system keeps a single copy of the file in its
+page cache no matter how many workers attach to it.
+
+    from reporting.datastore import shared_csv
+
+    prices = shared_csv('data/dji_sector_prices.csv', parse_dates=['date'])
+
+    @app.callback(Output('outgraph', 'figure'), Input('company_dd', 'value'))
+    def make_outgraph(sym):
+        df = prices.frame()
+        ...
+
+New data is published as a new version with ``publish``. Processes that call
+``frame()`` or ``table()`` afterwards switch to the new version, callbacks
+running at that moment keep the version they started with.
+"""
+
+import os
+import time
+
+import pandas as pd
+import pyarrow as pa
+
+
+DEFAULT_STORE = os.path.join('data', '.arrow')
+
+
+def _pointer_path(name, store):
+    return os.path.join(store, f'{name}.current')
+
+
+def _version_path(name, version, store):
+    return os.path.join(store, f'{name}.v{version}.arrow')
+
+
+def current_version(name, store=DEFAULT_STORE):
+    """Version number currently published for ``name``, None if there is none."""
+    try:
+        with open(_pointer_path(name, store)) as f:
+            return int(f.read())
+    except FileNotFoundError:
+        return None
+
+
+def _write_atomic(path, write):
+    tmp = f'{path}.{os.getpid()}.tmp'
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def publish(df, name, store=DEFAULT_STORE, keep=2):
+    """Write ``df`` as the next version of ``name`` and return its number.
+
+    The ``keep`` most recent versions stay on disk for processes that have
+    not switched yet.
+    """
+    os.makedirs(store, exist_ok=True)
+    version = (current_version(name, store) or 0) + 1
+    table = pa.Table.from_pandas(df, preserve_index=False)
+
+    def write_table(path):
+        with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+    def write_pointer(path):
+        with open(path, 'w') as f:
+            f.write(str(version))
+
+    _write_atomic(_version_path(name, version, store), write_table)
+    _write_atomic(_pointer_path(name, store), write_pointer)
+
+    for old in range(version - keep, 0, -1):
+        try:
+            os.remove(_version_path(name, old, store))
+        except FileNotFoundError:
+            break
+        except OSError:
+            # still mapped by another process on Windows, try again next time
+            pass
+    return version
+
+
+def attach(name, version=None, store=DEFAULT_STORE):
+    """Memory-map a published version (default: the current one) as a ``pa.Table``.
+
+    No data is read until columns are accessed.
+    """
+    version = version or current_version(name, store)
+    if version is None:
+        raise FileNotFoundError(f"nothing has been published as '{name}' in {store}")
+    source = pa.memory_map(_version_path(name, version, store), 'r')
+    return pa.ipc.open_file(source).read_all()
+
+
+class SharedFrame:
+    """Handle on a published dataset that follows new versions.
+
+    ``check_interval`` is the minimum number of seconds between two looks at
+    the version pointer.
+    """
+
+    def __init__(self, name, store=DEFAULT_STORE, check_interval=1.0):
+        self.name = name
+        self.store = store
+        self.check_interval = check_interval
+        self.version = None
+        self._table = None
+        self._frame = None
+        self._checked = 0.0
+
+    def _refresh(self):
+        now = time.monotonic()
+        if self._table is not None and now - self._checked < self.check_interval:
+            return
+        self._checked = now
+        version = current_version(self.name, self.store)
+        if version != self.version:
+            self._table = attach(self.name, version, self.store)
+            self._frame = None
+            self.version = version
+
+    def table(self):
+        """Current version as a memory-mapped ``pa.Table``."""
+        self._refresh()
+        return self._table
+
+    def frame(self):
+        """Current version as a DataFrame.
+
+        The columns use ``pd.ArrowDtype`` and point into the mapped file, so
+        no per-process copy of the data is made.
+        """
+        self._refresh()
+        if self._frame is None:
+            self._frame = self._table.to_pandas(types_mapper=pd.ArrowDtype)
+        return self._frame
+
+
+def _try_lock(fd):
+    """Non-blocking exclusive lock on ``fd``; the OS drops it when the process dies."""
+    try:
+        if os.name == 'nt':
+            import msvcrt
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return False
+    return True
+
+
+def _acquire(lock_path, timeout):
+    fd = os.open(lock_path, os.O_CREAT | os.O_RDWR)
+    deadline = time.monotonic() + timeout
+    while not _try_lock(fd):
+        if time.monotonic() > deadline:
+            os.close(fd)
+            raise TimeoutError(f'{lock_path} is held by another process')
+        time.sleep(.05)
+    return fd
+
+
+def _release(fd):
+    if os.name == 'nt':
+        import msvcrt
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    os.close(fd)
+
+
+def shared_csv(path, name=None, store=DEFAULT_STORE, timeout=60, **read_csv_kwargs):
+    """``pd.read_csv`` replacement returning a ``SharedFrame``.
+
+    The csv is only parsed if it is newer than the published version, and only
+    by the first process that gets there; all others wait and attach.
+    """
+    name = name or os.path.splitext(os.path.basename(path))[0]
+    os.makedirs(store, exist_ok=True)
+
+    def is_stale():
+        version = current_version(name, store)
+        if version is None:
+            return True
+        published = os.stat(_version_path(name, version, store)).st_mtime
+        return os.stat(path).st_mtime > published
+
+    if is_stale():
+        lock_path = os.path.join(store, f'{name}.lock')
+        fd = _acquire(lock_path, timeout)
+        try:
+            if is_stale():
+                publish(pd.read_csv(path, **read_csv_kwargs), name, store)
+        finally:
+            _release(fd)
+    return SharedFrame(name, store)
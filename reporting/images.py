@@ -0,0 +1,107 @@
+"""Export many static images at once.
+
+Every ``fig.write_image('plotly.png')`` in a fresh process first has to start
+kaleido's headless browser, which takes longer than rendering the figure.
+``export_images`` takes all jobs of a report at once, renders them in one
+(or ``max_workers``) warm kaleido session(s) and skips every image whose
+figure, format and size have not changed since the last export:
+
+    from reporting.images import export_images
+
+    export_images([(fig, 'pdf', 'plotly.pdf'),
+                   (fig, 'png', 'plotly.png'),
+                   (fig2, 'svg', 'reports/returns.svg')], max_workers=2)
+
+The content hashes of exported images are kept in ``manifest``.
+"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+DEFAULT_MANIFEST = '.image_manifest.json'
+
+
+def figure_hash(fig_json, fmt, width=None, height=None, scale=None):
+    """Content hash of one export job."""
+    h = hashlib.sha256(fig_json.encode('utf-8'))
+    h.update(json.dumps([fmt, width, height, scale]).encode('utf-8'))
+    return h.hexdigest()
+
+
+def _load_manifest(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _kaleido_major():
+    try:
+        import kaleido
+    except ImportError:
+        return 0
+    return int(str(getattr(kaleido, '__version__', '0')).split('.')[0])
+
+
+def _render(jobs, width=None, height=None, scale=None):
+    """Render ``(fig_json, format, path)`` jobs in this process's kaleido session."""
+    import plotly.io as pio
+
+    figs = [pio.from_json(fig_json, skip_invalid=True) for fig_json, _, _ in jobs]
+    for _, _, path in jobs:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    if _kaleido_major() >= 1 and hasattr(pio, 'write_images'):
+        # plotly >= 6.1 with kaleido 1: one browser session for the whole batch
+        pio.write_images(figs, [path for _, _, path in jobs],
+                         format=[fmt for _, fmt, _ in jobs],
+                         width=width, height=height, scale=scale)
+    else:
+        # kaleido 0.2 keeps its subprocess alive after the first call
+        for fig, (_, fmt, path) in zip(figs, jobs):
+            pio.write_image(fig, path, format=fmt, width=width, height=height, scale=scale)
+    return [path for _, _, path in jobs]
+
+
+def export_images(jobs, max_workers=1, manifest=DEFAULT_MANIFEST, width=None, height=None,
+                  scale=None, force=False):
+    """Write ``(figure, format, path)`` jobs and return the paths actually written.
+
+    Images that exist and whose hash matches the manifest are skipped unless
+    ``force`` is set. With ``max_workers > 1`` the remaining jobs are split
+    into that many batches, each rendered by its own worker process.
+    """
+    hashes = _load_manifest(manifest) if manifest else {}
+
+    pending, new_hashes = [], {}
+    for fig, fmt, path in jobs:
+        fig_json = fig if isinstance(fig, str) else fig.to_json()
+        key = figure_hash(fig_json, fmt, width, height, scale)
+        if not force and hashes.get(path) == key and os.path.exists(path):
+            continue
+        pending.append((fig_json, fmt, path))
+        new_hashes[path] = key
+
+    if not pending:
+        return []
+
+    n_batches = max(min(max_workers, len(pending)), 1)
+    batches = [pending[i::n_batches] for i in range(n_batches)]
+    if n_batches == 1:
+        written = _render(batches[0], width, height, scale)
+    else:
+        written = []
+        with ProcessPoolExecutor(n_batches) as pool:
+            futures = [pool.submit(_render, batch, width, height, scale) for batch in batches]
+            for future in futures:
+                written.extend(future.result())
+
+    if manifest:
+        hashes.update(new_hashes)
+        with open(manifest, 'w', encoding='utf-8') as f:
+            json.dump(hashes, f, indent=1, sort_keys=True)
+    return written
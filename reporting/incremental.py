@@ -0,0 +1,223 @@
+"""Moving averages and the awesome oscillator updated one bar at a time.
+
+``awe_osc`` and the SMA_50/SMA_200 columns of 13_financial_stats are
+recomputed over the whole history whenever a new bar arrives. The objects
+here keep only what the next value needs: a ring buffer of the last ``window``
+bars and its running sum for a moving average, the decayed sums for an EMA.
+They are warm-started from the history once and then updated in constant
+time per bar, for one ticker or for many at once:
+
+    from reporting.incremental import AwesomeOscillator, RollingMean, load_state, save_state
+
+    ao = AwesomeOscillator.from_history(mmm.High, mmm.Low)
+    sma = RollingMean.from_history(mmm.Close, 50)
+    ao.update(high, low), sma.update(close)        # next bar
+
+    save_state('data/indicators.json', ao=ao, sma_50=sma)
+    state = load_state('data/indicators.json')      # after a restart
+    state['ao'].update(high, low)
+
+The values agree with ``reporting.indicators`` and pandas: a moving average
+is missing until ``window`` bars are seen and while the window holds a
+missing value.
+"""
+
+import json
+import os
+
+import numpy as np
+
+from reporting._arrays import as_float, ewm_alpha
+from reporting.indicators import ema as _ema
+
+
+class RollingMean:
+    """Mean of the last ``window`` bars, ``x.rolling(window).mean()``."""
+
+    kind = 'rolling_mean'
+
+    def __init__(self, window, n_assets=None):
+        if window < 1:
+            raise ValueError('window has to be at least 1 bar')
+        shape = () if n_assets is None else (n_assets,)
+        self.window = window
+        self._set_buffer(np.full((window,) + shape, np.nan))
+
+    def _set_buffer(self, buffer):
+        """Take ``buffer`` (oldest bar first) and recompute the running sums."""
+        self.buffer = buffer
+        self.pos = 0
+        self.total = np.nansum(buffer, axis=0)
+        self.missing = np.isnan(buffer).sum(axis=0)
+
+    @classmethod
+    def from_history(cls, x, window):
+        """State after the bars in ``x``, shape (bars,) or (bars, assets)."""
+        x = as_float(x)
+        rolling = cls(window, None if x.ndim == 1 else x.shape[1])
+        tail = x[-window:]
+        rolling.buffer[window - len(tail):] = tail
+        rolling._set_buffer(rolling.buffer)
+        return rolling
+
+    def update(self, x):
+        """Add one bar (scalar or one value per asset) and return the new mean."""
+        x = as_float(x)
+        old = self.buffer[self.pos]
+        x_nan, old_nan = np.isnan(x), np.isnan(old)
+        self.total = self.total + np.where(x_nan, 0, x) - np.where(old_nan, 0, old)
+        self.missing = self.missing + x_nan - old_nan
+        self.buffer[self.pos] = x
+        self.pos = (self.pos + 1) % self.window
+        if self.pos == 0:
+            # once per lap: drop the rounding error accumulated by the running sum
+            self.total = np.nansum(self.buffer, axis=0)
+        return self.value
+
+    @property
+    def value(self):
+        return np.where(self.missing == 0, self.total / self.window, np.nan)
+
+    def to_dict(self):
+        return {'kind': self.kind, 'window': self.window,
+                'buffer': np.roll(self.buffer, -self.pos, axis=0).tolist()}
+
+    @classmethod
+    def from_dict(cls, state):
+        rolling = cls(state['window'])
+        rolling._set_buffer(as_float(state['buffer']))
+        return rolling
+
+
+class EMA:
+    """Exponentially weighted mean, ``x.ewm(span=span, alpha=alpha, adjust=adjust).mean()``.
+
+    Keeps the decayed sums of the values and of the weights; a missing value
+    ages both, as with pandas' default ``ignore_na=False``. With
+    ``adjust=False`` the sums are scaled back to a weight of 1 after every
+    observation, as pandas does. Gives the same values as
+    ``reporting.indicators.ema``.
+    """
+
+    kind = 'ema'
+
+    def __init__(self, span=None, alpha=None, adjust=True, n_assets=None):
+        shape = () if n_assets is None else (n_assets,)
+        self.alpha = ewm_alpha(span, alpha)
+        self.adjust = adjust
+        self.num = np.zeros(shape)
+        self.den = np.zeros(shape)
+
+    @classmethod
+    def from_history(cls, x, span=None, alpha=None, adjust=True):
+        """State after the bars in ``x``, shape (bars,) or (bars, assets)."""
+        x = as_float(x)
+        ema = cls(span, alpha, adjust, None if x.ndim == 1 else x.shape[1])
+        decay = 1 - ema.alpha
+        valid = ~np.isnan(x)
+        ages = np.arange(len(x))[::-1]
+        weights = decay ** ages
+        if adjust:
+            ema.num = weights @ np.where(valid, x, 0)
+            ema.den = weights @ valid
+        elif len(x):
+            # weight 1 at the last observation, aged by the missing bars after it
+            seen = valid.any(axis=0)
+            last = np.where(seen, _ema(x, alpha=ema.alpha, adjust=False)[-1], 0)
+            ema.den = np.where(seen, decay ** np.argmax(valid[::-1], axis=0), 0)
+            ema.num = last * ema.den
+        return ema
+
+    def update(self, x):
+        """Add one bar (scalar or one value per asset) and return the new mean."""
+        x = as_float(x)
+        valid = ~np.isnan(x)
+        decay = 1 - self.alpha
+        gain = 1.0 if self.adjust else self.alpha
+        self.num = decay * self.num + np.where(valid, gain * x, 0)
+        self.den = decay * self.den + np.where(valid, gain, 0)
+        if not self.adjust:
+            # pandas restarts the weights at every observation
+            with np.errstate(invalid='ignore', divide='ignore'):
+                self.num = np.where(valid, self.num / self.den, self.num)
+            self.den = np.where(valid, 1.0, self.den)
+        return self.value
+
+    @property
+    def value(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.den > 0, self.num / self.den, np.nan)
+
+    def to_dict(self):
+        return {'kind': self.kind, 'alpha': self.alpha, 'adjust': self.adjust,
+                'num': self.num.tolist(), 'den': self.den.tolist()}
+
+    @classmethod
+    def from_dict(cls, state):
+        ema = cls(alpha=state['alpha'], adjust=state['adjust'])
+        ema.num = as_float(state['num'])
+        ema.den = as_float(state['den'])
+        return ema
+
+
+class AwesomeOscillator:
+    """``awe_osc`` of 13_financial_stats: SMA(fast) - SMA(slow) of the median price."""
+
+    kind = 'awesome_oscillator'
+
+    def __init__(self, fast=5, slow=34, n_assets=None):
+        self.fast = RollingMean(fast, n_assets)
+        self.slow = RollingMean(slow, n_assets)
+
+    @classmethod
+    def from_history(cls, high, low, fast=5, slow=34):
+        median_price = 0.5 * (as_float(high) + as_float(low))
+        ao = cls.__new__(cls)
+        ao.fast = RollingMean.from_history(median_price, fast)
+        ao.slow = RollingMean.from_history(median_price, slow)
+        return ao
+
+    def update(self, high, low):
+        """Add one bar and return the new oscillator value."""
+        median_price = 0.5 * (as_float(high) + as_float(low))
+        return self.fast.update(median_price) - self.slow.update(median_price)
+
+    @property
+    def value(self):
+        return self.fast.value - self.slow.value
+
+    def to_dict(self):
+        return {'kind': self.kind, 'fast': self.fast.to_dict(), 'slow': self.slow.to_dict()}
+
+    @classmethod
+    def from_dict(cls, state):
+        ao = cls.__new__(cls)
+        ao.fast = RollingMean.from_dict(state['fast'])
+        ao.slow = RollingMean.from_dict(state['slow'])
+        return ao
+
+
+KINDS = {cls.kind: cls for cls in (RollingMean, EMA, AwesomeOscillator)}
+
+
+def from_dict(state):
+    """Indicator object from the output of its ``to_dict``."""
+    return KINDS[state['kind']].from_dict(state)
+
+
+def save_state(path, **indicators):
+    """Write the state of the named indicators to the JSON file ``path``.
+
+    The file is replaced atomically, a process reading it at the same time
+    sees either the old or the new state.
+    """
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump({name: ind.to_dict() for name, ind in indicators.items()}, f)
+    os.replace(tmp, path)
+
+
+def load_state(path):
+    """Dict of the indicators written by ``save_state``."""
+    with open(path) as f:
+        return {name: from_dict(state) for name, state in json.load(f).items()}
@@ -0,0 +1,208 @@
+"""Moving averages and other rolling indicators for many tickers at once.
+
+The SMA_50/SMA_200 lines and ``awe_osc`` in 13_financial_stats each build
+their own ``rolling(...).mean()``; ``awe_osc`` runs two rolling windows over
+the same median price. The functions here take (dates x tickers) arrays and
+compute all window lengths from one cumulative sum:
+
+    from reporting.indicators import rolling_mean, awesome_oscillator
+
+    sma = rolling_mean(mmm.Close, [50, 200])     # {50: ..., 200: ...}
+    ao = awesome_oscillator(df.High, df.Low)     # same values as awe_osc
+
+Every function follows the pandas counterpart with default arguments: a
+window containing a missing value is missing. ``rolling_std`` is accurate to
+rounding error even for series that drift far from their starting level;
+pandas' running update can be off by about 1e-6 (relative) on such series.
+"""
+
+import numpy as np
+from scipy.signal import lfilter
+
+from reporting._arrays import as_float, blank_windows, ewm_alpha, nan_counts, window_sums, wrap
+
+
+def _windowed(x, windows, compute):
+    single = isinstance(windows, (int, np.integer))
+    results = {w: wrap(x, v) for w, v in compute(as_float(x), [windows] if single else list(windows)).items()}
+    return results[windows] if single else results
+
+
+def rolling_mean(x, windows):
+    """``x.rolling(w).mean()`` for one window or a list of windows (dict)."""
+    def compute(x, windows):
+        nan = np.isnan(x)
+        counts = nan_counts(nan)
+        result = {}
+        for w, sums in window_sums(x, windows, nan, counts):
+            sums /= w
+            result[w] = blank_windows(sums, w, counts)
+        return result
+    return _windowed(x, windows, compute)
+
+
+def _rolling_m2(x, w, nan):
+    """Sums of squared deviations from the mean over the last w rows.
+
+    Global cumulative sums of squares lose precision once the series drifts
+    away from its starting level. Here the rows are cut into blocks of length
+    w, each block gets its own anchor (its mean) and local prefix sums. A
+    window is the tail of one block plus the head of the next; the two
+    pieces are combined around the window mean.
+    """
+    n = len(x)
+    n_blocks = -(-n // w)
+    tail_shape = x.shape[1:]
+    filled = np.where(nan, 0, x)
+    # one leading block of zeros stands in for "before the first row"
+    dev = np.zeros(((n_blocks + 1) * w,) + tail_shape)
+    dev[w:w + n] = filled
+    valid = np.zeros(dev.shape, dtype=bool)
+    valid[w:w + n] = ~nan
+    blocks = dev.reshape((n_blocks + 1, w) + tail_shape)
+    valid_blocks = valid.reshape(blocks.shape)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        anchors = np.nan_to_num(blocks.sum(axis=1) / valid_blocks.sum(axis=1))
+    blocks -= anchors[:, None]
+    blocks[~valid_blocks] = 0
+    p1 = np.cumsum(blocks, axis=1).reshape(dev.shape)
+    p2 = np.cumsum(blocks * blocks, axis=1).reshape(dev.shape)
+    t1, t2 = p1[w - 1::w], p2[w - 1::w]
+
+    end = np.arange(w - 1, n) + w          # padded row of each window's last row
+    block = end // w
+    shape = (-1,) + (1,) * len(tail_shape)
+    head_n = (end % w + 1).reshape(shape)
+    tail_n = w - head_n
+    head1, head2 = p1[end], p2[end]
+    tail1, tail2 = t1[block - 1] - p1[end - w], t2[block - 1] - p2[end - w]
+    a_head, a_tail = anchors[block], anchors[block - 1]
+
+    mean = (head1 + tail1 + head_n * a_head + tail_n * a_tail) / w
+    d_head, d_tail = a_head - mean, a_tail - mean
+    m2 = np.full(x.shape, np.nan)
+    m2[w - 1:] = (head2 + 2 * d_head * head1 + head_n * d_head ** 2
+                  + tail2 + 2 * d_tail * tail1 + tail_n * d_tail ** 2)
+    return m2
+
+
+def rolling_std(x, windows, ddof=1):
+    """``x.rolling(w).std()`` for one window or a list of windows (dict)."""
+    def compute(x, windows):
+        nan = np.isnan(x)
+        counts = nan_counts(nan)
+        result = {}
+        for w in windows:
+            var = _rolling_m2(x, w, nan) if w <= len(x) else np.empty(x.shape)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                var /= w - ddof
+            np.maximum(var, 0, out=var)
+            result[w] = blank_windows(np.sqrt(var, out=var), w, counts)
+        return result
+    return _windowed(x, windows, compute)
+
+
+def _rolling_extreme(x, w, op, fill, nan, counts):
+    """Van Herk/Gil-Werman: prefix and suffix extremes within blocks of length w."""
+    n = len(x)
+    out = np.empty(x.shape)
+    if w <= n:
+        n_blocks = -(-n // w)
+        padded = np.empty((n_blocks * w,) + x.shape[1:])
+        padded[:n] = x
+        padded[n:] = fill
+        if counts is not None:
+            padded[:n][nan] = fill
+        blocks = padded.reshape((n_blocks, w) + x.shape[1:])
+        prefix = np.empty_like(padded)
+        suffix = np.empty_like(padded)
+        op.accumulate(blocks, axis=1, out=prefix.reshape(blocks.shape))
+        op.accumulate(blocks[:, ::-1], axis=1, out=suffix.reshape(blocks.shape)[:, ::-1])
+        # window [i - w + 1, i] = suffix from its start + prefix up to i
+        op(suffix[:n - w + 1], prefix[w - 1:n], out=out[w - 1:])
+    return blank_windows(out, w, counts)
+
+
+def _extremes(x, windows, op, fill):
+    nan = np.isnan(x)
+    counts = nan_counts(nan)
+    return {w: _rolling_extreme(x, w, op, fill, nan, counts) for w in windows}
+
+
+def rolling_max(x, windows):
+    """``x.rolling(w).max()`` in O(n) per window length."""
+    return _windowed(x, windows, lambda x, windows: _extremes(x, windows, np.maximum, -np.inf))
+
+
+def rolling_min(x, windows):
+    """``x.rolling(w).min()`` in O(n) per window length."""
+    return _windowed(x, windows, lambda x, windows: _extremes(x, windows, np.minimum, np.inf))
+
+
+def _restarting_ewm(filled, valid, alpha):
+    """pandas' ``adjust=False`` recursion: after every observation the weights
+    are scaled back to a total of 1, so a gap of k dates gives the next value
+    the weight alpha / (decay ** (k + 1) + alpha)."""
+    decay = 1 - alpha
+    num, den = np.empty(filled.shape), np.empty(filled.shape)
+    n, d = np.zeros(filled.shape[1:]), np.zeros(filled.shape[1:])
+    for t in range(len(filled)):
+        n = decay * n + alpha * filled[t]
+        d = decay * d + alpha * valid[t]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            n = np.where(valid[t], n / d, n)
+        d = np.where(valid[t], 1.0, d)
+        num[t], den[t] = n, d
+    return num, den
+
+
+def ema(x, span=None, alpha=None, adjust=True):
+    """``x.ewm(span=span, alpha=alpha, adjust=adjust).mean()`` along the dates.
+
+    Both recursions are linear filters run by ``scipy.signal.lfilter`` for
+    all tickers at once. Missing values are skipped but still age the older
+    observations, as with pandas' default ``ignore_na=False``. With
+    ``adjust=False`` pandas restarts the weights at every observation, which
+    only matters after a gap; tickers with gaps are run through that
+    recursion one date at a time instead.
+    """
+    alpha = ewm_alpha(span, alpha)
+    values = as_float(x)
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, 0)
+    decay = 1 - alpha
+
+    if adjust:
+        num = lfilter([1], [1, -decay], filled, axis=0)
+        den = lfilter([1], [1, -decay], valid.astype(float), axis=0)
+    else:
+        # y_t = decay * y_{t-1} + alpha * x_t, each observation weighted
+        # relative to the running total of weights
+        num = lfilter([alpha], [1, -decay], filled, axis=0)
+        den = lfilter([alpha], [1, -decay], valid.astype(float), axis=0)
+        first = np.argmax(valid, axis=0)
+        # pandas starts with y_0 = x_0 instead of alpha * x_0
+        start = np.take_along_axis(filled, np.expand_dims(first, 0), axis=0) if values.ndim > 1 else filled[first]
+        steps = np.arange(len(values)).reshape(-1, *([1] * (values.ndim - 1))) - first
+        carry = np.where(steps >= 0, decay ** np.maximum(steps, 0), 0)
+        num = num + (1 - alpha) * start * carry
+        den = den + (1 - alpha) * carry
+        gapped = (~valid & (np.cumsum(valid, axis=0) > 0)).any(axis=0)
+        if np.any(gapped):
+            if values.ndim == 1:
+                num, den = _restarting_ewm(filled[:, None], valid[:, None], alpha)
+                num, den = num[:, 0], den[:, 0]
+            else:
+                num[:, gapped], den[:, gapped] = _restarting_ewm(filled[:, gapped], valid[:, gapped], alpha)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        result = np.where(den > 0, num / den, np.nan)
+    return wrap(x, result)
+
+
+def awesome_oscillator(high, low, fast=5, slow=34):
+    """``awe_osc`` of 13_financial_stats: SMA(fast) - SMA(slow) of the median price."""
+    if slow < fast:
+        fast, slow = slow, fast
+    median_price = 0.5 * (as_float(high) + as_float(low))
+    sma = rolling_mean(median_price, [fast, slow])
+    return wrap(high, sma[fast] - sma[slow])
@@ -0,0 +1,249 @@
+"""Local store of daily OHLCV bars in front of yfinance.
+
+The financial-stats notebooks download ``yf.Ticker('MSFT').history(...)``,
+``AMD`` and ``AAPL`` again on every run. ``MarketStore`` keeps the bars in a
+SQLite file, one row per symbol and date under a (symbol, date) primary key,
+and remembers which date ranges were fetched for each symbol. ``history``
+answers from disk and asks the provider only for the parts of the requested
+range that were never fetched:
+
+    from reporting.marketdata import FakeProvider, MarketStore
+
+    store = MarketStore()                                # data/market.sqlite, yfinance
+    msft = store.history('MSFT', start='2020-01-01')     # same columns as Ticker.history
+
+    offline = MarketStore(':memory:', provider=FakeProvider())
+
+Ranges are half-open, ``start`` included and ``end`` excluded, as in
+yfinance. The current day is never recorded as fetched, so its bar is
+fetched again until the day is over.
+
+Yahoo adjusts the prices before a dividend or split once it happens, so bars
+stored earlier are on another basis than bars fetched after it. The store
+keeps the Dividends and Stock Splits columns, and when a fetch brings an
+action dated after bars already on disk, all bars of the symbol are fetched
+again.
+"""
+
+import os
+import sqlite3
+import zlib
+from abc import ABC, abstractmethod
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_DB = os.path.join('data', 'market.sqlite')
+COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+ACTIONS = ['Dividends', 'Stock Splits']
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bars (
+    symbol TEXT NOT NULL, date TEXT NOT NULL,
+    open REAL, high REAL, low REAL, close REAL, volume REAL,
+    dividends REAL, splits REAL,
+    PRIMARY KEY (symbol, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS coverage (
+    symbol TEXT NOT NULL, start TEXT NOT NULL, end TEXT NOT NULL,
+    PRIMARY KEY (symbol, start)
+);
+"""
+
+
+def _day(value):
+    day = pd.Timestamp(value)
+    if day.tzinfo is not None:
+        day = day.tz_localize(None)
+    return day.normalize()
+
+
+class Provider(ABC):
+    """Source of daily bars; subclasses implement ``fetch``."""
+
+    @abstractmethod
+    def fetch(self, symbol, start, end):
+        """Bars of ``symbol`` for dates in [start, end) as a DataFrame with a
+        DatetimeIndex and the columns Open, High, Low, Close, Volume,
+        Dividends and Stock Splits (0 on days without an action)."""
+
+
+class YFinanceProvider(Provider):
+    """Bars from ``yfinance.Ticker(symbol).history``."""
+
+    def __init__(self, **history_kwargs):
+        self.history_kwargs = history_kwargs
+
+    def fetch(self, symbol, start, end):
+        import yfinance as yf
+
+        df = yf.Ticker(symbol).history(start=start, end=end, actions=True, **self.history_kwargs)
+        if df.index.tz is not None:
+            df.index = df.index.tz_localize(None)
+        df = df.reindex(columns=COLUMNS + ACTIONS)
+        df[ACTIONS] = df[ACTIONS].fillna(0)
+        return df
+
+
+class FakeProvider(Provider):
+    """Deterministic random-walk bars on business days, for offline use.
+
+    The bars depend only on the symbol, the date and the ``splits``, a dict
+    of {date: ratio} applied to all symbols: as on Yahoo, prices before a
+    split are divided by its ratio once the fetch reaches the split date.
+    ``calls`` records every (symbol, start, end) that was fetched.
+    """
+
+    origin = pd.Timestamp('2000-01-03')
+
+    def __init__(self, volatility=0.02, splits=None):
+        self.volatility = volatility
+        self.splits = {_day(d): ratio for d, ratio in (splits or {}).items()}
+        self.calls = []
+
+    def fetch(self, symbol, start, end):
+        self.calls.append((symbol, start, end))
+        dates = pd.bdate_range(self.origin, end, inclusive='left')
+        rng = np.random.default_rng(zlib.crc32(symbol.encode()))
+        returns = rng.normal(0, self.volatility, (len(dates), 4))
+        close = 100 * np.exp(np.cumsum(returns[:, 0]))
+        open_ = close * np.exp(returns[:, 1] / 4)
+        spread = np.abs(returns[:, 2]) * close
+        df = pd.DataFrame({'Open': open_,
+                           'High': np.maximum(open_, close) + spread,
+                           'Low': np.minimum(open_, close) - spread,
+                           'Close': close,
+                           'Volume': np.round(1e6 * np.exp(25 * returns[:, 3])),
+                           'Dividends': 0.0, 'Stock Splits': 0.0},
+                          index=dates)
+        for day, ratio in self.splits.items():
+            if day in df.index:
+                df.loc[df.index < day, COLUMNS[:4]] /= ratio
+                df.loc[df.index < day, 'Volume'] *= ratio
+                df.loc[day, 'Stock Splits'] = ratio
+        return df[df.index >= start]
+
+
+class MarketStore:
+    """Daily bars in the SQLite file ``path``, filled from ``provider``."""
+
+    def __init__(self, path=DEFAULT_DB, provider=None):
+        self.path = path
+        self.provider = YFinanceProvider() if provider is None else provider
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        if path != ':memory:':
+            self._conn.execute('PRAGMA journal_mode=WAL')
+        columns = [row[1] for row in self._conn.execute('PRAGMA table_info(bars)')]
+        if columns and 'splits' not in columns:
+            # bars stored without their corporate actions cannot be checked
+            # against new ones, so they are fetched again
+            self._conn.executescript('DROP TABLE bars; DROP TABLE coverage;')
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def coverage(self, symbol):
+        """Fetched (start, end) ranges of ``symbol``, sorted and disjoint."""
+        rows = self._conn.execute('SELECT start, end FROM coverage WHERE symbol = ? ORDER BY start',
+                                  (symbol,)).fetchall()
+        return [(pd.Timestamp(s), pd.Timestamp(e)) for s, e in rows]
+
+    def gaps(self, symbol, start, end):
+        """Parts of [start, end) that are not covered yet."""
+        gaps = []
+        cursor = start
+        for s, e in self.coverage(symbol):
+            if e <= cursor:
+                continue
+            if s >= end:
+                break
+            if s > cursor:
+                gaps.append((cursor, s))
+            cursor = max(cursor, e)
+        if cursor < end:
+            gaps.append((cursor, end))
+        return gaps
+
+    def _add_coverage(self, symbol, start, end):
+        """Record [start, end) as fetched, merged with the ranges it touches."""
+        with self._conn:
+            rows = self._conn.execute('SELECT start, end FROM coverage WHERE symbol = ? AND start <= ? AND end >= ?',
+                                      (symbol, end.date().isoformat(), start.date().isoformat())).fetchall()
+            for s, e in rows:
+                start, end = min(start, pd.Timestamp(s)), max(end, pd.Timestamp(e))
+            self._conn.executemany('DELETE FROM coverage WHERE symbol = ? AND start = ?',
+                                   [(symbol, s) for s, _ in rows])
+            self._conn.execute('INSERT INTO coverage VALUES (?, ?, ?)',
+                               (symbol, start.date().isoformat(), end.date().isoformat()))
+
+    def _insert(self, symbol, df):
+        df = df.reindex(columns=COLUMNS + ACTIONS)
+        df[ACTIONS] = df[ACTIONS].fillna(0)
+        rows = [(symbol, d.date().isoformat(), *values)
+                for d, values in zip(df.index, df.itertuples(index=False, name=None))]
+        with self._conn:
+            self._conn.executemany('INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+
+    def _readjusts(self, symbol, df):
+        """Whether ``df`` has an action dated after a stored bar, which
+        changes the adjustment of that bar."""
+        actions = df.reindex(columns=ACTIONS).fillna(0)
+        acted = df.index[(actions != 0).any(axis=1)]
+        if not len(acted):
+            return False
+        row = self._conn.execute('SELECT 1 FROM bars WHERE symbol = ? AND date < ? LIMIT 1',
+                                 (symbol, acted.max().date().isoformat())).fetchone()
+        return row is not None
+
+    def _invalidate(self, symbol):
+        """Forget the bars and coverage of ``symbol``; returns the covered span."""
+        covered = self.coverage(symbol)
+        with self._conn:
+            self._conn.execute('DELETE FROM bars WHERE symbol = ?', (symbol,))
+            self._conn.execute('DELETE FROM coverage WHERE symbol = ?', (symbol,))
+        return (covered[0][0], covered[-1][1]) if covered else None
+
+    def _fetch(self, symbol, start, end, today):
+        df = self.provider.fetch(symbol, start, end)
+        if df is not None and len(df):
+            if self._readjusts(symbol, df):
+                span = self._invalidate(symbol)
+                if span is not None:
+                    start, end = min(start, span[0]), max(end, span[1])
+                    df = self.provider.fetch(symbol, start, end)
+            self._insert(symbol, df)
+        # today's bar is not final yet
+        done = min(end, today)
+        if start < done:
+            self._add_coverage(symbol, start, done)
+
+    def history(self, symbol, start='2000-01-01', end=None):
+        """Bars of ``symbol`` for dates in [start, end), end defaults to tomorrow."""
+        today = pd.Timestamp.today().normalize()
+        start = _day(start)
+        end = today + pd.Timedelta(days=1) if end is None else _day(end)
+
+        # a refetch after a new action may cover the remaining gaps too
+        gaps = self.gaps(symbol, start, end)
+        while gaps:
+            self._fetch(symbol, *gaps[0], today)
+            gaps = [g for g in self.gaps(symbol, start, end) if g[0] >= gaps[0][1]]
+
+        df = pd.read_sql_query('SELECT date, open, high, low, close, volume, dividends, splits FROM bars '
+                               'WHERE symbol = ? AND date >= ? AND date < ? ORDER BY date',
+                               self._conn, params=(symbol, start.date().isoformat(), end.date().isoformat()),
+                               parse_dates=['date'], index_col='date')
+        df.columns = COLUMNS + ACTIONS
+        df.index.name = 'Date'
+        return df
+
+
+def history(symbol, start='2000-01-01', end=None, path=DEFAULT_DB):
+    """``MarketStore(path).history(symbol, start, end)`` with yfinance behind it."""
+    with closing(MarketStore(path)) as store:
+        return store.history(symbol, start, end)
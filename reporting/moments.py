@@ -0,0 +1,133 @@
+"""Running mean, volatility, skewness and kurtosis.
+
+13_financial_stats computes ``mean``, ``std``, ``skew`` and ``kurt`` of
+``msft.daily_return`` in four passes over the whole history. ``OnlineMoments``
+keeps the count and the central moment sums up to the fourth order for any
+number of assets and updates them with every new return or batch of returns
+(Welford's method, generalised by Pébay, 2008). Two accumulators, e.g. from
+different chunks or processes, can be merged:
+
+    from reporting.moments import OnlineMoments
+
+    m = OnlineMoments()
+    m.update(msft.daily_return.to_numpy())   # history
+    m.update(0.012)                          # next tick
+    m.mean, m.std, m.skew, m.kurt            # same definitions as pandas
+
+    total = OnlineMoments.merge(m_2020, m_2021)
+
+Missing values are skipped per asset.
+"""
+
+import numpy as np
+
+
+class OnlineMoments:
+    """Count, mean and central moment sums M2, M3, M4 per asset."""
+
+    def __init__(self, n_assets=None):
+        shape = () if n_assets is None else (n_assets,)
+        self.n = np.zeros(shape)
+        self.mean_ = np.zeros(shape)
+        self.m2 = np.zeros(shape)
+        self.m3 = np.zeros(shape)
+        self.m4 = np.zeros(shape)
+
+    @classmethod
+    def from_batch(cls, x):
+        """Moments of ``x``, shape (observations,) or (observations, assets)."""
+        x = np.asarray(x, dtype=float)
+        moments = cls(None if x.ndim == 1 else x.shape[1])
+        valid = ~np.isnan(x)
+        n = valid.sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(n > 0, np.nansum(x, axis=0) / n, 0)
+        d = np.where(valid, x - mean, 0)
+        d2 = d * d
+        moments.n = n.astype(float)
+        moments.mean_ = mean
+        moments.m2 = d2.sum(axis=0)
+        moments.m3 = (d2 * d).sum(axis=0)
+        moments.m4 = (d2 * d2).sum(axis=0)
+        return moments
+
+    @classmethod
+    def merge(cls, a, b):
+        """Moments of the union of the observations behind ``a`` and ``b``."""
+        merged = cls()
+        n = a.n + b.n
+        delta = b.mean_ - a.mean_
+        with np.errstate(invalid='ignore', divide='ignore'):
+            d_n = np.where(n > 0, delta / n, 0)
+        na_nb = a.n * b.n
+
+        merged.n = n
+        merged.mean_ = a.mean_ + b.n * d_n
+        merged.m2 = a.m2 + b.m2 + delta * d_n * na_nb
+        merged.m3 = (a.m3 + b.m3 + delta * d_n * d_n * na_nb * (a.n - b.n)
+                     + 3 * d_n * (a.n * b.m2 - b.n * a.m2))
+        merged.m4 = (a.m4 + b.m4 + delta * d_n ** 3 * na_nb * (a.n * a.n - na_nb + b.n * b.n)
+                     + 6 * d_n * d_n * (a.n * a.n * b.m2 + b.n * b.n * a.m2)
+                     + 4 * d_n * (a.n * b.m3 - b.n * a.m3))
+        return merged
+
+    def update(self, x):
+        """Add one observation per asset (shape (assets,) or scalar) or a batch.
+
+        A batch has shape (observations, assets), or (observations,) for a
+        single asset.
+        """
+        x = np.asarray(x, dtype=float)
+        if x.ndim == self.n.ndim:
+            x = x[None]
+        merged = self.merge(self, self.from_batch(x))
+        self.n, self.mean_ = merged.n, merged.mean_
+        self.m2, self.m3, self.m4 = merged.m2, merged.m3, merged.m4
+        return self
+
+    def __add__(self, other):
+        return self.merge(self, other)
+
+    @property
+    def mean(self):
+        return np.where(self.n > 0, self.mean_, np.nan)
+
+    @property
+    def var(self):
+        """Sample variance (ddof=1)."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.n > 1, self.m2 / (self.n - 1), np.nan)
+
+    @property
+    def std(self):
+        return np.sqrt(self.var)
+
+    @property
+    def skew(self):
+        """Bias-corrected skewness, as ``pd.Series.skew``."""
+        n = self.n
+        with np.errstate(invalid='ignore', divide='ignore'):
+            g1 = np.sqrt(n) * self.m3 / self.m2 ** 1.5
+            return np.where(n > 2, np.sqrt(n * (n - 1)) / (n - 2) * g1, np.nan)
+
+    @property
+    def kurt(self):
+        """Bias-corrected excess kurtosis, as ``pd.Series.kurt``."""
+        n = self.n
+        with np.errstate(invalid='ignore', divide='ignore'):
+            g2 = n * self.m4 / self.m2 ** 2 - 3
+            return np.where(n > 3, ((n + 1) * g2 + 6) * (n - 1) / ((n - 2) * (n - 3)), np.nan)
+
+    def to_dict(self):
+        return {'n': self.n.tolist(), 'mean': self.mean_.tolist(),
+                'm2': self.m2.tolist(), 'm3': self.m3.tolist(), 'm4': self.m4.tolist()}
+
+    @classmethod
+    def from_dict(cls, state):
+        moments = cls()
+        moments.n = np.asarray(state['n'], dtype=float)
+        moments.mean_ = np.asarray(state['mean'], dtype=float)
+        moments.m2 = np.asarray(state['m2'], dtype=float)
+        moments.m3 = np.asarray(state['m3'], dtype=float)
+        moments.m4 = np.asarray(state['m4'], dtype=float)
+        return moments
@@ -0,0 +1,129 @@
+"""Monte Carlo simulation of prices from a model of the daily returns.
+
+13_financial_stats describes the MSFT return distribution with its moments
+and a KDE plot but never simulates forward. Three return models can be
+fitted to the daily returns: ``GBM`` (normal log returns), ``Bootstrap``
+(resampled historical returns) and ``StudentT`` (fat tails). ``simulate``
+draws price paths for plotting; ``terminal_values`` draws millions of paths
+in blocks of ``batch_size`` paths and keeps only the final value of each, in
+parallel processes, each block with its own ``SeedSequence`` stream:
+
+    from reporting.montecarlo import StudentT, terminal_values, value_at_risk
+
+    model = StudentT.fit(msft.daily_return.dropna())
+    final = terminal_values(model, n_paths=2_000_000, n_steps=21, seed=42)
+    value_at_risk(final, levels=(0.95, 0.99))      # one-month VaR and ES
+
+The blocks are seeded by position, so results depend on ``seed`` only, not
+on the number of processes.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+
+def _log_returns(returns):
+    r = np.log1p(np.asarray(returns, dtype=float))
+    return r[~np.isnan(r)]
+
+
+class GBM:
+    """Geometric Brownian motion: normal daily log returns."""
+
+    def __init__(self, mu, sigma):
+        self.mu = mu
+        self.sigma = sigma
+
+    @classmethod
+    def fit(cls, returns):
+        """Fit to simple daily returns."""
+        r = _log_returns(returns)
+        return cls(r.mean(), r.std(ddof=1))
+
+    def sample(self, rng, size):
+        """Daily log returns of shape ``size``."""
+        return rng.normal(self.mu, self.sigma, size)
+
+
+class Bootstrap:
+    """Daily log returns drawn with replacement from the history."""
+
+    def __init__(self, log_returns):
+        self.log_returns = np.asarray(log_returns, dtype=float)
+
+    @classmethod
+    def fit(cls, returns):
+        return cls(_log_returns(returns))
+
+    def sample(self, rng, size):
+        return self.log_returns[rng.integers(0, len(self.log_returns), size)]
+
+
+class StudentT:
+    """Student-t daily log returns with location, scale and degrees of freedom."""
+
+    def __init__(self, df, loc, scale):
+        self.df = df
+        self.loc = loc
+        self.scale = scale
+
+    @classmethod
+    def fit(cls, returns):
+        """Maximum likelihood fit (``scipy.stats.t.fit``) to simple daily returns."""
+        from scipy import stats
+
+        return cls(*stats.t.fit(_log_returns(returns)))
+
+    def sample(self, rng, size):
+        return self.loc + self.scale * rng.standard_t(self.df, size)
+
+
+def simulate(model, n_paths, n_steps, s0=1.0, seed=None):
+    """Price paths, shape (n_steps + 1, n_paths), starting at ``s0``."""
+    rng = np.random.default_rng(seed)
+    paths = np.empty((n_steps + 1, n_paths))
+    paths[0] = 0
+    np.cumsum(model.sample(rng, (n_steps, n_paths)), axis=0, out=paths[1:])
+    return s0 * np.exp(paths)
+
+
+def _terminal_block(model, n_paths, n_steps, s0, seed_seq):
+    rng = np.random.default_rng(seed_seq)
+    return s0 * np.exp(model.sample(rng, (n_paths, n_steps)).sum(axis=1))
+
+
+def terminal_values(model, n_paths, n_steps, s0=1.0, seed=None, batch_size=100_000, n_jobs=None):
+    """Values after ``n_steps`` days of ``n_paths`` simulated paths.
+
+    Paths are simulated ``batch_size`` at a time, so memory stays at
+    ``batch_size * n_steps`` draws per process. Every block gets its own
+    child of ``np.random.SeedSequence(seed)``.
+    """
+    sizes = [min(batch_size, n_paths - start) for start in range(0, n_paths, batch_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    n_jobs = min(n_jobs or os.cpu_count() or 1, len(sizes))
+    args = ([model] * len(sizes), sizes, [n_steps] * len(sizes), [s0] * len(sizes), seeds)
+
+    if n_jobs == 1:
+        blocks = list(map(_terminal_block, *args))
+    else:
+        with ProcessPoolExecutor(n_jobs) as pool:
+            blocks = list(pool.map(_terminal_block, *args))
+    return np.concatenate(blocks)
+
+
+def value_at_risk(terminal, s0=1.0, levels=(0.95, 0.99)):
+    """Value at risk and expected shortfall of the loss ``1 - terminal / s0``.
+
+    Returns a DataFrame with one row per confidence level; both measures
+    are fractions of the starting value, positive for losses.
+    """
+    losses = 1 - np.asarray(terminal, dtype=float) / s0
+    rows = []
+    for level in levels:
+        var = np.quantile(losses, level)
+        rows.append({'level': level, 'VaR': var, 'ES': losses[losses >= var].mean()})
+    return pd.DataFrame(rows).set_index('level')
@@ -0,0 +1,148 @@
+"""Candlesticks aggregated to the zoom level of the chart.
+
+``go.Candlestick`` over ``stock_data.Date`` with the ``INTC_*`` columns draws
+every daily bar, even when decades are visible and hundreds of bars share a
+pixel. ``resample_ohlc`` aggregates bars into weeks, months, quarters, years
+or groups of N bars with ``reduceat`` kernels; ``OHLCPyramid`` caches every
+level and picks the finest one that still fits into the chart.
+
+    from reporting.ohlc import OHLCPyramid, candlestick_figure, register_ohlc_zoom
+
+    stock_data = pd.read_csv('data/historical_data.csv', parse_dates=['Date'])
+    pyramid = OHLCPyramid.from_prefix(stock_data, 'INTC_')
+    app.layout = html.Div([dcc.Graph(id='candles', figure=candlestick_figure(pyramid.for_viewport()))])
+    register_ohlc_zoom(app, 'candles', pyramid)
+"""
+
+import numpy as np
+import pandas as pd
+
+from reporting.timeseries import relayout_range
+
+
+LEVELS = (1, 'W', 'M', 'Q', 'Y')
+
+
+def bucket_starts(dates, rule):
+    """First row of every bucket; ``rule`` is 'W', 'M', 'Q', 'Y' or a bar count."""
+    n = len(dates)
+    if isinstance(rule, (int, np.integer)):
+        return np.arange(0, n, rule)
+
+    dates = np.asarray(dates, dtype='datetime64[D]')
+    if rule == 'W':
+        # 1970-01-01 was a Thursday, shifting by three days starts weeks on Monday
+        key = (dates.astype('int64') + 3) // 7
+    elif rule == 'M':
+        key = dates.astype('datetime64[M]').astype('int64')
+    elif rule == 'Q':
+        key = dates.astype('datetime64[M]').astype('int64') // 3
+    elif rule == 'Y':
+        key = dates.astype('datetime64[Y]').astype('int64')
+    else:
+        raise ValueError(f"unknown rule '{rule}', use 'W', 'M', 'Q', 'Y' or an integer")
+    return np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+
+
+def resample_ohlc(dates, open, high, low, close, volume=None, rule='W'):
+    """Aggregate bars; price arrays may be 1-D or (dates x assets).
+
+    Returns a dict with ``date`` (first date of each bucket) and the
+    aggregated fields. Missing values are skipped by ``high``, ``low`` and
+    ``volume``.
+    """
+    n = len(dates)
+    starts = bucket_starts(dates, rule) if n else np.array([], dtype=np.intp)
+    ends = np.r_[starts[1:], n][:len(starts)] - 1
+
+    result = {'date': np.asarray(dates)[starts],
+              'open': np.asarray(open)[starts],
+              'high': np.fmax.reduceat(np.asarray(high), starts, axis=0),
+              'low': np.fmin.reduceat(np.asarray(low), starts, axis=0),
+              'close': np.asarray(close)[ends],
+              'volume': None}
+    if volume is not None:
+        result['volume'] = np.add.reduceat(np.nan_to_num(np.asarray(volume, dtype=float)), starts, axis=0)
+    return result
+
+
+class OHLCPyramid:
+    """Daily bars plus cached aggregations for every level in ``levels``."""
+
+    def __init__(self, dates, open, high, low, close, volume=None, levels=LEVELS):
+        order = np.argsort(np.asarray(dates), kind='stable')
+        self.levels = tuple(levels)
+        self._base = {'date': np.asarray(dates)[order], 'open': np.asarray(open)[order],
+                      'high': np.asarray(high)[order], 'low': np.asarray(low)[order],
+                      'close': np.asarray(close)[order],
+                      'volume': None if volume is None else np.asarray(volume)[order]}
+        self._cache = {}
+
+    @classmethod
+    def from_prefix(cls, df, prefix, date='Date', **kwargs):
+        """Build from columns like ``INTC_Open``, ``INTC_High``, ... of a wide frame."""
+        volume = df[f'{prefix}Volume'] if f'{prefix}Volume' in df else None
+        return cls(df[date], df[f'{prefix}Open'], df[f'{prefix}High'], df[f'{prefix}Low'],
+                   df[f'{prefix}Close'], volume, **kwargs)
+
+    def level(self, rule):
+        """All bars at aggregation ``rule``, computed once."""
+        if rule == 1:
+            return self._base
+        if rule not in self._cache:
+            b = self._base
+            self._cache[rule] = resample_ohlc(b['date'], b['open'], b['high'], b['low'],
+                                              b['close'], b['volume'], rule)
+        return self._cache[rule]
+
+    def for_viewport(self, start=None, end=None, width_px=1000, px_per_bar=4):
+        """Bars between ``start`` and ``end`` at the finest level that fits.
+
+        A level fits if every candle gets at least ``px_per_bar`` pixels of the
+        ``width_px`` wide chart. Returns a DataFrame with ``date`` and the
+        OHLC(V) columns.
+        """
+        max_bars = max(width_px // px_per_bar, 1)
+        for rule in self.levels:
+            bars = self.level(rule)
+            dates = bars['date']
+            lo = 0 if start is None else np.searchsorted(dates, pd.Timestamp(start).to_datetime64(), 'left')
+            hi = len(dates) if end is None else np.searchsorted(dates, pd.Timestamp(end).to_datetime64(), 'right')
+            if hi - lo <= max_bars or rule == self.levels[-1]:
+                # one bar of margin on each side so the edges are not empty while panning
+                lo, hi = max(lo - 1, 0), min(hi + 1, len(dates))
+                frame = pd.DataFrame({k: v[lo:hi] for k, v in bars.items() if v is not None})
+                frame.attrs['rule'] = rule
+                return frame
+
+
+def candlestick_figure(bars, name=None):
+    """``go.Candlestick`` of a frame returned by ``for_viewport``."""
+    import plotly.graph_objects as go
+
+    fig = go.Figure(go.Candlestick(x=bars['date'], open=bars['open'], high=bars['high'],
+                                   low=bars['low'], close=bars['close'], name=name))
+    fig.update_layout(xaxis_rangeslider_visible=False, uirevision='ohlc')
+    return fig
+
+
+def register_ohlc_zoom(app, graph_id, pyramid, width_px=1000):
+    """Replace the candles of ``graph_id`` by the level matching each zoom."""
+    from dash import Patch, no_update
+    from dash.dependencies import Input, Output
+
+    @app.callback(Output(graph_id, 'figure'),
+                  Input(graph_id, 'relayoutData'),
+                  prevent_initial_call=True)
+    def rescale_candles(relayout_data):
+        if not relayout_data or not any(k.startswith('xaxis.') for k in relayout_data):
+            return no_update
+        start, end = relayout_range(relayout_data) or (None, None)
+        bars = pyramid.for_viewport(start, end, width_px)
+        patch = Patch()
+        for field in ('open', 'high', 'low', 'close'):
+            patch['data'][0][field] = bars[field].to_numpy()
+        patch['data'][0]['x'] = bars['date'].to_numpy()
+        return patch
+
+    return rescale_candles
@@ -0,0 +1,78 @@
+"""Returns of many portfolios from one returns matrix.
+
+13_financial_stats writes the portfolio return by hand as a weighted sum of
+the asset returns with weights that drift with the prices, the 2024 version
+takes a row-wise ``.mean(axis=1)``. ``portfolio_returns`` takes the returns
+of N assets over T periods and the weights of K candidate portfolios. Between
+two rebalancing dates the holdings drift with the prices, at each
+rebalancing date the weights are reset to their targets. The value of all K
+portfolios in a holding period is one matrix product of the assets' growth
+paths with the weights:
+
+    from reporting.portfolio import portfolio_returns
+
+    R = df[['A_return', 'B_return']].fillna(0)
+    portfolio_returns(R, [[.5, .5]])                  # buy and hold, as pf_return
+    portfolio_returns(R, [[.5, .5]], rebalance=1)     # fixed weights, as naive_pf_return
+    portfolio_returns(R, np.random.dirichlet(np.ones(2), 5000), rebalance=21)
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def rebalance_starts(n_periods, rebalance=None):
+    """First period of every holding period.
+
+    ``rebalance`` is None (buy and hold), an integer n (every n periods) or
+    a sequence of period indices at which the target weights are restored.
+    """
+    if rebalance is None:
+        return np.array([0])
+    if isinstance(rebalance, (int, np.integer)):
+        if rebalance < 1:
+            raise ValueError('rebalance has to be at least 1 period')
+        return np.arange(0, n_periods, rebalance)
+    starts = np.unique(np.r_[0, np.asarray(rebalance, dtype=int)])
+    return starts[starts < n_periods]
+
+
+def portfolio_returns(returns, weights, rebalance=None):
+    """Simple returns of K portfolios, shape (T, K).
+
+    ``returns`` holds simple returns of N assets, shape (T, N); row t is the
+    return from t-1 to t, missing values count as 0. ``weights`` is (K, N)
+    for fixed targets or (R, K, N) with one set of targets for each of the R
+    holding periods given by ``rebalance``.
+    """
+    R = np.nan_to_num(np.asarray(returns, dtype=float))
+    W = np.asarray(weights, dtype=float)
+    if W.ndim == 1:
+        W = W[None, :]
+    n_periods = len(R)
+    starts = rebalance_starts(n_periods, rebalance)
+    if W.ndim == 3 and len(W) != len(starts):
+        raise ValueError(f'{len(W)} weight sets for {len(starts)} holding periods')
+
+    if W.ndim == 2 and len(starts) == n_periods:
+        # rebalanced every period: a weighted sum per row
+        result = R @ W.T
+    else:
+        result = np.empty((n_periods, W.shape[-2]))
+        ends = np.r_[starts[1:], n_periods]
+        for i, (start, end) in enumerate(zip(starts, ends)):
+            w = W[i] if W.ndim == 3 else W
+            growth = np.cumprod(1 + R[start:end], axis=0)
+            value = growth @ w.T
+            previous = np.vstack([w.sum(axis=1), value[:-1]])
+            result[start:end] = value / previous - 1
+
+    if isinstance(returns, pd.DataFrame):
+        return pd.DataFrame(result, index=returns.index)
+    return result
+
+
+def portfolio_values(returns, weights, rebalance=None, start_value=1.0):
+    """Value paths of the K portfolios, shape (T, K)."""
+    path = np.cumprod(1 + np.asarray(portfolio_returns(returns, weights, rebalance)), axis=0)
+    return start_value * path
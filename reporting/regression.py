@@ -0,0 +1,92 @@
+"""One linear regression per group, all groups fitted together.
+
+09_sklearn splits insurance.csv by hand into smokers and non-smokers, builds
+four reshaped arrays and fits ``LinearRegression`` and ``sm.OLS`` for each
+group. ``grouped_ols`` does this for every level of any column at once: the
+sums X'X, X'y and y'y of all groups are accumulated in a single pass with
+``np.bincount`` and the normal equations of all groups are solved as one
+stacked array.
+
+    from reporting.regression import grouped_ols
+
+    df = pd.read_csv('data/insurance.csv')
+    grouped_ols(df, 'charges', 'bmi', by='smoker')
+    grouped_ols(df, 'charges', ['age', 'bmi'], by=['region', 'sex'])
+
+The result has one row per group and term with ``coef``, ``std_err``, ``t``
+and ``p_value`` (as in ``res.summary()``) plus the group's ``r2`` and ``n``.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+
+def grouped_ols(df, y, x, by, add_constant=True):
+    """Fit ``y ~ x`` by ordinary least squares separately for each group of ``by``."""
+    x = [x] if isinstance(x, str) else list(x)
+    by = [by] if isinstance(by, str) else list(by)
+
+    data = df[by + x + [y]].dropna()
+    grouped = data.groupby(by, sort=True)
+    codes = grouped.ngroup().to_numpy()
+    keys = list(grouped.size().index)
+    n_groups = len(keys)
+
+    X = data[x].to_numpy(dtype=float)
+    Y = data[y].to_numpy(dtype=float)
+    terms = list(x)
+    if add_constant:
+        # fit on the centered columns; the intercept and its covariance
+        # for the original columns are recovered below
+        x_mean, y_mean = X.mean(axis=0), Y.mean()
+        X = np.column_stack([np.ones(len(X)), X - x_mean])
+        Y = Y - y_mean
+        terms = ['const'] + terms
+    p = X.shape[1]
+
+    def group_sum(weights):
+        return np.bincount(codes, weights=weights, minlength=n_groups)
+
+    n = group_sum(None)
+    xtx = np.empty((n_groups, p, p))
+    for i in range(p):
+        for j in range(i, p):
+            xtx[:, i, j] = xtx[:, j, i] = group_sum(X[:, i] * X[:, j])
+    xty = np.stack([group_sum(X[:, i] * Y) for i in range(p)], axis=1)
+    yty = group_sum(Y * Y)
+    y_sum = group_sum(Y)
+
+    xtx_inv = np.linalg.pinv(xtx)
+    beta = np.einsum('gij,gj->gi', xtx_inv, xty)
+    sse = np.maximum(yty - np.einsum('gi,gi->g', beta, xty), 0)
+    dof = n - p
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sigma2 = np.where(dof > 0, sse / dof, np.nan)
+        # without a constant R² is uncentered, as in statsmodels
+        sst = yty - y_sum ** 2 / n if add_constant else yty
+        r2 = 1 - sse / sst
+    cov = sigma2[:, None, None] * xtx_inv
+
+    if add_constant:
+        # undo the centering: const = const_c + y_mean - slopes @ x_mean
+        T = np.eye(p)
+        T[0, 1:] = -x_mean
+        beta = beta @ T.T
+        beta[:, 0] += y_mean
+        cov = T @ cov @ T.T
+
+    std_err = np.sqrt(np.diagonal(cov, axis1=1, axis2=2))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = beta / std_err
+    p_value = 2 * stats.t.sf(np.abs(t), df=dof[:, None])
+
+    index = pd.MultiIndex.from_tuples(
+        [(*(key if isinstance(key, tuple) else (key,)), term) for key in keys for term in terms],
+        names=by + ['term'])
+    return pd.DataFrame({'coef': beta.ravel(),
+                         'std_err': std_err.ravel(),
+                         't': t.ravel(),
+                         'p_value': p_value.ravel(),
+                         'r2': np.repeat(r2, p),
+                         'n': np.repeat(n.astype(int), p)}, index=index)
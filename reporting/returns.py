@@ -0,0 +1,81 @@
+"""Returns of many assets at once.
+
+13_financial_stats adds discrete, log and back-converted returns as separate
+columns, one pandas pass each. ``compute_returns`` takes a whole price panel
+(dates x assets) and fills all requested kinds into one preallocated block,
+every kind derived from the one before with ``out=`` buffers:
+
+    from reporting.returns import compute_returns
+
+    r = compute_returns(df[['A', 'B']], kinds=('simple', 'log', 'cumulative'))
+    r['simple']          # same as df[['A', 'B']].pct_change()
+
+Missing prices give missing simple, log and excess returns. Cumulative
+returns are taken against the first available price and carried over gaps.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+KINDS = ('simple', 'log', 'excess', 'cumulative')
+
+
+def _ffill_index(valid):
+    """Row of the last valid value at or before each row (0 before the first)."""
+    rows = np.where(valid, np.arange(len(valid)).reshape(-1, *([1] * (valid.ndim - 1))), 0)
+    return np.maximum.accumulate(rows, axis=0)
+
+
+def compute_returns(prices, kinds=('simple', 'log'), rf=0.0, dtype=np.float64):
+    """Returns of ``prices`` (1-D or dates x assets) for every kind in ``kinds``.
+
+    ``kinds`` is any of 'simple', 'log', 'excess' (simple minus ``rf``) and
+    'cumulative'. ``rf`` is a per-period rate, scalar or one value per date.
+    Returns a dict of arrays, or of DataFrames with the index and columns of
+    ``prices`` if it is a DataFrame.
+    """
+    unknown = set(kinds) - set(KINDS)
+    if unknown:
+        raise ValueError(f'unknown kinds {sorted(unknown)}, use {KINDS}')
+
+    P = np.asarray(prices, dtype=dtype)
+    need_simple = bool({'simple', 'log', 'excess'} & set(kinds))
+    # simple returns get a scratch slot at the end when they are not requested
+    scratch = need_simple and 'simple' not in kinds
+    block = np.empty((len(kinds) + scratch,) + P.shape, dtype=dtype)
+    out = dict(zip(kinds, block))
+    simple = out.get('simple', block[-1])
+
+    if need_simple:
+        simple[0] = np.nan
+        np.divide(P[1:], P[:-1], out=simple[1:])
+        np.subtract(simple[1:], 1, out=simple[1:])
+    if 'log' in kinds:
+        np.log1p(simple, out=out['log'])
+    if 'excess' in kinds:
+        rf = np.asarray(rf, dtype=dtype)
+        if rf.ndim == 1 and P.ndim == 2:
+            rf = rf[:, None]
+        np.subtract(simple, rf, out=out['excess'])
+    if 'cumulative' in kinds:
+        cum = out['cumulative']
+        valid = ~np.isnan(P)
+        if valid.all():
+            np.divide(P, P[0], out=cum)
+        else:
+            filled = np.take_along_axis(P, _ffill_index(valid), axis=0)
+            first = np.take_along_axis(P, np.argmax(valid, axis=0)[None], axis=0)
+            np.divide(filled, first, out=cum)
+        np.subtract(cum, 1, out=cum)
+
+    if isinstance(prices, pd.DataFrame):
+        return {k: pd.DataFrame(v, index=prices.index, columns=prices.columns) for k, v in out.items()}
+    if isinstance(prices, pd.Series):
+        return {k: pd.Series(v, index=prices.index, name=prices.name) for k, v in out.items()}
+    return out
+
+
+def simple_from_log(log_returns):
+    """Discrete returns from log returns, ``np.exp(r) - 1``."""
+    return np.expm1(log_returns)
@@ -0,0 +1,136 @@
+"""StandardScaler for data that does not fit into memory.
+
+09_sklearn scales ``np.random.normal(2, 5, 10000000)`` in memory and keeps
+``x``, ``x_rescaled`` and ``x_alt_scaled`` side by side. Stored as ``.npy``
+files the arrays can be memory-mapped instead and processed chunk by chunk,
+so only one chunk has to be in memory at any time:
+
+    from reporting.scaling import fit_memmap, transform_memmap
+
+    np.save('data/x.npy', x)
+    scaler = fit_memmap(['data/x.npy'])
+    transform_memmap(scaler, 'data/x.npy', 'data/x_rescaled.npy')
+    transform_memmap(scaler, 'data/x_alt.npy')          # in place
+
+The fitted ``scaler`` is an ordinary ``StandardScaler``; ``partial_fit``
+combines the chunk statistics so ``mean_`` and ``scale_`` equal the ones of a
+fit on the whole array up to floating point rounding.
+
+``scale_array`` is the transform itself, ``(x - mean) / scale`` without the
+``reshape(-1, 1)`` copies and temporaries of the manual check in 09_sklearn:
+
+    calc_result = scale_array(x_alt, scaler.mean_, scaler.scale_)
+    scale_array(x_alt, scaler.mean_, scaler.scale_, out=x_alt)   # in place
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+
+
+DEFAULT_CHUNK_ROWS = 1_000_000
+# 32k float64 values per block, i.e. 256 kB, stay in the L2 cache between
+# the subtraction and the division
+DEFAULT_BLOCK_ELEMENTS = 1 << 15
+
+
+def _as_2d(block):
+    return block.reshape(-1, 1) if block.ndim == 1 else block
+
+
+def iter_chunks(n_rows, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """``(start, stop)`` row ranges covering ``n_rows``."""
+    for start in range(0, n_rows, chunk_rows):
+        yield start, min(start + chunk_rows, n_rows)
+
+
+def scale_array(x, mean, scale, out=None, block_elements=DEFAULT_BLOCK_ELEMENTS, n_threads=None):
+    """Compute ``(x - mean) / scale`` block by block into ``out``.
+
+    ``x`` may be 1-D or (rows x features) and float32 or float64; other
+    dtypes are computed in float64. Each block is subtracted and divided while
+    it is in the cache and blocks are spread over ``n_threads`` threads
+    (default: all cores). ``out=x`` scales in place. The results are
+    identical to ``StandardScaler.transform``.
+    """
+    x = np.asarray(x)
+    dtype = x.dtype if x.dtype in (np.float32, np.float64) else np.dtype(np.float64)
+    if out is None:
+        out = np.empty(x.shape, dtype=dtype)
+    elif out.shape != x.shape:
+        raise ValueError(f'out has shape {out.shape}, expected {x.shape}')
+    mean = np.asarray(mean, dtype=dtype)
+    scale = np.asarray(scale, dtype=dtype)
+
+    n_rows = len(x)
+    row_size = max(int(np.prod(x.shape[1:])), 1)
+    block_rows = max(block_elements // row_size, 1)
+
+    def work(bounds):
+        start, stop = bounds
+        block = out[start:stop]
+        np.subtract(x[start:stop], mean, out=block, casting='unsafe')
+        np.divide(block, scale, out=block)
+
+    blocks = list(iter_chunks(n_rows, block_rows))
+    n_threads = n_threads or os.cpu_count() or 1
+    if n_threads == 1 or len(blocks) == 1:
+        for bounds in blocks:
+            work(bounds)
+    else:
+        # numpy releases the GIL inside ufuncs, so the threads run in parallel
+        with ThreadPoolExecutor(n_threads) as pool:
+            list(pool.map(work, blocks, chunksize=max(len(blocks) // (4 * n_threads), 1)))
+    return out
+
+
+def _scaler_parameters(scaler):
+    mean = scaler.mean_ if scaler.with_mean else 0.0
+    scale = scaler.scale_ if scaler.with_std else 1.0
+    return mean, scale
+
+
+def fit_memmap(paths, chunk_rows=DEFAULT_CHUNK_ROWS, scaler=None):
+    """Fit a ``StandardScaler`` over one or several ``.npy`` files, chunk by chunk."""
+    scaler = scaler or StandardScaler()
+    if isinstance(paths, str):
+        paths = [paths]
+    for path in paths:
+        x = np.load(path, mmap_mode='r')
+        for start, stop in iter_chunks(len(x), chunk_rows):
+            scaler.partial_fit(_as_2d(np.asarray(x[start:stop])))
+    return scaler
+
+
+def transform_memmap(scaler, src, out=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Scale the ``.npy`` file ``src`` chunk by chunk.
+
+    ``out`` is the path of a new ``.npy`` file, an already allocated array
+    (e.g. a memmap) of the same shape, or None to overwrite ``src`` in place.
+    A new file is float32 for float32 input and float64 otherwise; integer
+    files can not be scaled in place. Returns the (memory-mapped) result.
+    """
+    if out is None:
+        x = np.load(src, mmap_mode='r+')
+        dest = x
+    else:
+        x = np.load(src, mmap_mode='r')
+        if isinstance(out, str):
+            dtype = np.float32 if x.dtype == np.float32 else np.float64
+            dest = np.lib.format.open_memmap(out, mode='w+', dtype=dtype, shape=x.shape)
+        else:
+            dest = out
+            if dest.shape != x.shape:
+                raise ValueError(f'out has shape {dest.shape}, expected {x.shape}')
+    if not np.issubdtype(dest.dtype, np.floating):
+        raise TypeError(f'scaled values need a float output, got {dest.dtype}; pass out=')
+
+    mean, scale = _scaler_parameters(scaler)
+    for start, stop in iter_chunks(len(x), chunk_rows):
+        scale_array(x[start:stop], mean, scale, out=dest[start:stop])
+
+    if isinstance(dest, np.memmap):
+        dest.flush()
+    return dest
@@ -0,0 +1,153 @@
+"""Serve one of the course apps with a multi-worker WSGI server.
+
+In the notebooks every app is a ``JupyterDash`` object started with
+``app.run_server(mode='inline')``, i.e. the single-threaded Flask development
+server. ``to_dash`` copies such an app into a plain ``dash.Dash`` app with gzip
+compression and long-lived caching headers for fingerprinted files, ``serve``
+runs it with gunicorn (waitress on Windows). From the repository root:
+
+    python -m reporting.serve 11_dash_II.ipynb:4 --workers 4 --port 8050
+    python -m reporting.serve my_app.py:app
+
+A notebook is given as ``file.ipynb:N``: its code cells up to and including
+code cell ``N`` (counted from 0) are executed and the ``app`` defined there is
+served. Calls to ``app.run_server`` and IPython magics are skipped and
+``JupyterDash`` is replaced by ``dash.Dash``, so jupyter_dash does not have to
+be installed on the server.
+"""
+
+import argparse
+import importlib
+import importlib.util
+import inspect
+import json
+import os
+import sys
+
+import dash
+
+
+ONE_YEAR = 365 * 24 * 3600
+
+
+def to_dash(app, name=None, compress=True, **kwargs):
+    """Copy layout, callbacks and settings of a (Jupyter)Dash app into a plain Dash app.
+
+    All of ``app.config`` (stylesheets, scripts, assets folder, callback
+    options, ...) is kept except ``compress`` and ``serve_locally``. Component
+    bundles are served locally with version fingerprints, files in
+    ``assets/`` get dash's modification-time query string. Both are sent with a
+    one year ``Cache-Control`` so browsers only ask for them once.
+    """
+    accepted = inspect.signature(dash.Dash.__init__).parameters
+    # pages_folder is stored resolved and fails validation when no pages are used
+    settings = {k: v for k, v in app.config.items() if k in accepted and k != 'pages_folder'}
+    settings.update(name=name or app.config.name, compress=compress, serve_locally=True, **kwargs)
+    standalone = dash.Dash(**settings)
+    standalone.title = app.title
+    standalone.index_string = app.index_string
+    standalone.layout = app.layout
+    standalone.callback_map.update(app.callback_map)
+    standalone._callback_list.extend(app._callback_list)
+    standalone._inline_scripts.extend(app._inline_scripts)
+
+    assets_prefix = standalone.config.routes_pathname_prefix + standalone.config.assets_url_path.strip('/')
+
+    @standalone.server.after_request
+    def add_cache_headers(response):
+        from flask import request
+
+        fingerprinted = (request.path.startswith(assets_prefix) and 'm' in request.args)
+        if fingerprinted and response.status_code == 200:
+            response.cache_control.public = True
+            response.cache_control.max_age = ONE_YEAR
+            response.cache_control.immutable = True
+        return response
+
+    return standalone
+
+
+def _skip_line(line):
+    stripped = line.strip()
+    return stripped.startswith(('%', '!', 'app.run_server'))
+
+
+def _rewrite_line(line):
+    if line.strip() == 'from jupyter_dash import JupyterDash':
+        return line.replace('from jupyter_dash import JupyterDash', 'from dash import Dash as JupyterDash')
+    return line
+
+
+def load_notebook_app(path, cell, name='app'):
+    """Execute the code cells of a notebook up to ``cell`` and return ``name``."""
+    with open(path, encoding='utf-8') as f:
+        nb = json.load(f)
+
+    code_cells = [c for c in nb['cells'] if c['cell_type'] == 'code']
+    namespace = {'__name__': os.path.splitext(os.path.basename(path))[0]}
+    for i, c in enumerate(code_cells[:cell + 1]):
+        source = ''.join(c['source'])
+        source = '\n'.join(_rewrite_line(line) for line in source.splitlines() if not _skip_line(line))
+        exec(compile(source, f'{path}[{i}]', 'exec'), namespace)
+    return namespace[name]
+
+
+def load_app(spec):
+    """Load an app from ``notebook.ipynb:N``, ``file.py:attr`` or ``module:attr``."""
+    target, _, attr = spec.partition(':')
+    if target.endswith('.ipynb'):
+        return load_notebook_app(target, int(attr))
+
+    attr = attr or 'app'
+    if target.endswith('.py'):
+        module_name = os.path.splitext(os.path.basename(target))[0]
+        module_spec = importlib.util.spec_from_file_location(module_name, target)
+        module = importlib.util.module_from_spec(module_spec)
+        module_spec.loader.exec_module(module)
+    else:
+        module = importlib.import_module(target)
+    return getattr(module, attr)
+
+
+def serve(app, host='0.0.0.0', port=8050, workers=None, threads=2):
+    """Serve ``app`` with gunicorn, or with waitress where gunicorn is missing."""
+    workers = workers or (os.cpu_count() or 1) * 2 + 1
+    server = app.server
+
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        # gunicorn does not run on Windows, waitress uses threads instead
+        from waitress import serve as waitress_serve
+        waitress_serve(server, host=host, port=port, threads=workers * threads)
+        return
+
+    class _Application(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', f'{host}:{port}')
+            self.cfg.set('workers', workers)
+            self.cfg.set('threads', threads)
+            self.cfg.set('preload_app', True)
+
+        def load(self):
+            return server
+
+    _Application().run()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('app', help="notebook.ipynb:N, file.py:attr or module:attr")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8050)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--threads', type=int, default=2)
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, os.getcwd())
+    app = to_dash(load_app(args.app))
+    serve(app, host=args.host, port=args.port, workers=args.workers, threads=args.threads)
+
+
+if __name__ == '__main__':
+    main()
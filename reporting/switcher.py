@@ -0,0 +1,94 @@
+"""Switch between companies of a long-format price table.
+
+The slider and button examples add one ``go.Scatter`` per company and toggle
+hand-written ``visible`` lists like ``[True, False, False]``.
+``visibility_buttons`` and ``visibility_steps`` generate those lists for any
+number of traces:
+
+    fig = go.Figure([go.Scatter(x=g.date, y=g.open, name=s) for s, g in df.groupby('symbol')])
+    fig.update_layout(updatemenus=[{'buttons': visibility_buttons([t.name for t in fig.data])}])
+
+That figure still contains every series. ``company_switcher`` builds a Dash
+dropdown and graph instead; the graph holds one series and the data of another
+company is only sent when it is selected, so the page weight does not grow
+with the number of tickers:
+
+    app.layout = company_switcher(app, df, x='date', y='open', symbol='symbol')
+"""
+
+import numpy as np
+
+from reporting.export import encode_array
+
+
+def _visibility(n, i):
+    return [j == i for j in range(n)]
+
+
+def visibility_buttons(names, title=True):
+    """``updatemenus`` buttons showing one trace at a time, in the order of ``names``."""
+    names = list(names)
+    buttons = []
+    for i, name in enumerate(names):
+        layout = {'title': {'text': name}} if title else {}
+        buttons.append({'label': name, 'method': 'update',
+                        'args': [{'visible': _visibility(len(names), i)}, layout]})
+    return buttons
+
+
+def visibility_steps(names, title=True):
+    """Slider ``steps`` showing one trace at a time, in the order of ``names``.
+
+    Slider steps take the same ``label``/``method``/``args`` as buttons.
+    """
+    return visibility_buttons(names, title)
+
+
+def _encode(a):
+    """Typed array of a numeric column, a plain list otherwise (e.g. date strings)."""
+    encoded = encode_array(a)
+    return a.tolist() if encoded is None else encoded
+
+
+def company_switcher(app, df, x='date', y='open', symbol='symbol', id='switcher', value=None):
+    """Dropdown plus graph that loads the series of the selected company on demand.
+
+    Returns the layout element; the callback is registered on ``app``.
+    """
+    import plotly.graph_objects as go
+    from dash import Patch, dcc, html
+    from dash.dependencies import Input, Output
+
+    rows = df.groupby(symbol, sort=False).indices
+    symbols = list(rows)
+    value = value if value is not None else symbols[0]
+    xs, ys = df[x].to_numpy(), df[y].to_numpy()
+
+    def series(sym):
+        idx = rows[sym]
+        return _encode(xs[idx]), _encode(ys[idx])
+
+    fig = go.Figure(go.Scatter(mode='lines', name=value))
+    fig.update_layout(title={'text': value}, yaxis_title=y, uirevision=id)
+    if np.issubdtype(xs.dtype, np.datetime64):
+        fig.update_layout(xaxis_type='date')
+    fig_dict = fig.to_dict()
+    fig_dict['data'][0]['x'], fig_dict['data'][0]['y'] = series(value)
+
+    dropdown_id, graph_id = f'{id}_dd', f'{id}_graph'
+
+    @app.callback(Output(graph_id, 'figure'),
+                  Input(dropdown_id, 'value'),
+                  prevent_initial_call=True)
+    def load_company(sym):
+        patch = Patch()
+        patch['data'][0]['x'], patch['data'][0]['y'] = series(sym)
+        patch['data'][0]['name'] = sym
+        patch['layout']['title']['text'] = sym
+        return patch
+
+    return html.Div([
+        dcc.Dropdown(id=dropdown_id, options=[{'label': s, 'value': s} for s in symbols],
+                     value=value, clearable=False),
+        dcc.Graph(id=graph_id, figure=fig_dict)
+    ], id=id)
@@ -0,0 +1,183 @@
+"""Line charts for long price histories.
+
+A ``go.Scatter`` per ``_Open`` column of ``historical_data.csv`` is fine for
+daily prices over a few years. With intraday data the browser receives far
+more points than the chart has pixels and SVG rendering gets slow. Here the
+series are reduced to about two points per horizontal pixel (min-max buckets
+or LTTB) and drawn with ``Scattergl`` once they are longer than ``threshold``.
+
+    from reporting.timeseries import timeseries_figure, register_resampling
+
+    df = pd.read_csv('data/historical_data.csv', parse_dates=['Date'])
+    cols = [c for c in df.columns if c.endswith('_Open')]
+    app.layout = html.Div([dcc.Graph(id='prices', figure=timeseries_figure(df, 'Date', cols))])
+    register_resampling(app, 'prices', df, 'Date', cols)
+
+``register_resampling`` adds a callback that, whenever the user zooms or moves
+the range slider, sends the visible window again at full screen resolution.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _as_numeric(x):
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype('datetime64[ns]').view('int64').astype(float)
+    return x.astype(float)
+
+
+def minmax_indices(y, n_out):
+    """Indices of the minimum and maximum in each of ``n_out // 2`` buckets."""
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    n_buckets = max(n_out // 2, 1)
+    if n <= n_out:
+        return np.arange(n)
+
+    size = -(-n // n_buckets)
+    n_buckets = -(-n // size)
+    padded = np.full(n_buckets * size, np.nan)
+    padded[:n] = y
+    blocks = padded.reshape(n_buckets, size)
+    nan = np.isnan(blocks)
+
+    starts = np.arange(n_buckets) * size
+    lo = starts + np.argmin(np.where(nan, np.inf, blocks), axis=1)
+    hi = starts + np.argmax(np.where(nan, -np.inf, blocks), axis=1)
+    return np.unique(np.minimum(np.concatenate([lo, hi]), n - 1))
+
+
+def lttb_indices(x, y, n_out):
+    """Indices chosen by Largest-Triangle-Three-Buckets (Steinarsson, 2013)."""
+    x = _as_numeric(x)
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+
+    # bucket borders for the n - 2 inner points, first and last are always kept
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    # mean of each bucket, used as third corner of the triangle
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    avg_x = np.append(sums_x / counts, x[-1])
+    avg_y = np.append(sums_y / counts, y[-1])
+
+    out = np.empty(n_out, dtype=np.intp)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        cx, cy = avg_x[i + 1], avg_y[i + 1]
+        area = np.abs((x[a] - cx) * (y[start:stop] - y[a])
+                      - (x[a] - x[start:stop]) * (cy - y[a]))
+        a = start + np.nanargmax(area) if np.isfinite(area).any() else start
+        out[i + 1] = a
+    return out
+
+
+def downsample(x, y, n_out, method='minmax'):
+    """Return ``x`` and ``y`` reduced to about ``n_out`` points."""
+    if method == 'minmax':
+        idx = minmax_indices(y, n_out)
+    elif method == 'lttb':
+        idx = lttb_indices(x, y, n_out)
+    else:
+        raise ValueError(f"unknown method '{method}', use 'minmax' or 'lttb'")
+    return np.asarray(x)[idx], np.asarray(y)[idx]
+
+
+def _traces(df, x, columns, width_px, threshold, method):
+    import plotly.graph_objects as go
+
+    trace_type = go.Scattergl if len(df) > threshold else go.Scatter
+    traces = []
+    for col in columns:
+        xs, ys = downsample(df[x].to_numpy(), df[col].to_numpy(), 2 * width_px, method)
+        traces.append(trace_type(x=xs, y=ys, name=col, mode='lines'))
+    return traces
+
+
+def _full_range(df, x):
+    return [df[x].iloc[0], df[x].iloc[-1]]
+
+
+def timeseries_figure(df, x, columns, width_px=1200, threshold=5000, method='minmax',
+                      rangeslider=True):
+    """Line chart of ``columns`` over ``x`` with range slider and buttons.
+
+    ``df`` has to be sorted by ``x``. Above ``threshold`` rows WebGL traces are
+    used; note that plotly.js leaves the range slider preview empty for them.
+    The slider is pinned to the full history, so it still spans all of it
+    after ``register_resampling`` has replaced the traces by a window.
+    """
+    import plotly.graph_objects as go
+
+    fig = go.Figure(_traces(df, x, columns, width_px, threshold, method))
+    fig.update_layout(xaxis={'rangeslider': {'visible': rangeslider, 'autorange': False,
+                                             'range': _full_range(df, x)},
+                             'rangeselector': {'buttons': [
+                                 {'count': 1, 'label': '1m', 'step': 'month', 'stepmode': 'backward'},
+                                 {'count': 6, 'label': '6m', 'step': 'month', 'stepmode': 'backward'},
+                                 {'count': 1, 'label': 'YTD', 'step': 'year', 'stepmode': 'todate'},
+                                 {'count': 1, 'label': '1y', 'step': 'year', 'stepmode': 'backward'},
+                                 {'step': 'all'}]}},
+                      uirevision='timeseries')
+    return fig
+
+
+def relayout_range(relayout_data, axis='xaxis'):
+    """Visible ``(start, end)`` from a graph's ``relayoutData``.
+
+    Returns None for autorange (the full history) and for events that do not
+    touch the axis.
+    """
+    if not relayout_data or relayout_data.get(f'{axis}.autorange'):
+        return None
+    if f'{axis}.range[0]' in relayout_data:
+        return relayout_data[f'{axis}.range[0]'], relayout_data[f'{axis}.range[1]']
+    if f'{axis}.range' in relayout_data:
+        return tuple(relayout_data[f'{axis}.range'])
+    return None
+
+
+def window(df, x, x_range):
+    """Rows of ``df`` (sorted by ``x``) inside ``x_range`` plus one row on each side."""
+    if x_range is None:
+        return df
+    values = df[x].to_numpy()
+    low, high = x_range
+    if np.issubdtype(values.dtype, np.datetime64):
+        low, high = pd.Timestamp(low).to_datetime64(), pd.Timestamp(high).to_datetime64()
+    start = max(np.searchsorted(values, low, side='left') - 1, 0)
+    stop = np.searchsorted(values, high, side='right') + 1
+    return df.iloc[start:stop]
+
+
+def register_resampling(app, graph_id, df, x, columns, width_px=1200, method='minmax'):
+    """Re-send the visible window of ``graph_id`` in full resolution after zooming."""
+    from dash import Patch, no_update
+    from dash.dependencies import Input, Output
+
+    full_range = _full_range(df, x)
+
+    @app.callback(Output(graph_id, 'figure'),
+                  Input(graph_id, 'relayoutData'),
+                  prevent_initial_call=True)
+    def resample_visible(relayout_data):
+        if not relayout_data or not any(k.startswith('xaxis.') for k in relayout_data):
+            return no_update
+        visible = window(df, x, relayout_range(relayout_data))
+        patch = Patch()
+        for i, col in enumerate(columns):
+            xs, ys = downsample(visible[x].to_numpy(), visible[col].to_numpy(), 2 * width_px, method)
+            patch['data'][i]['x'] = xs
+            patch['data'][i]['y'] = ys
+        # the traces now hold only the window, keep the slider on the full history
+        patch['layout']['xaxis']['rangeslider']['range'] = full_range
+        return patch
+
+    return resample_visible
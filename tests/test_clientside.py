@@ -0,0 +1,69 @@
+import shutil
+
+import pytest
+
+dash = pytest.importorskip('dash')
+
+from dash import dcc, html
+from dash.dependencies import Input, Output
+
+from reporting.clientside import TIMES_TWO_JS, check_transform, compare_callback, transform_callback
+
+pytestmark = pytest.mark.skipif(shutil.which('node') is None, reason='node is not installed')
+
+
+def _app():
+    app = dash.Dash(__name__)
+    app.layout = html.Div([dcc.Input(id='inum', value='', type='number'), html.P(id='outext'),
+                           dcc.Input(id='my-input', value='initial value', type='text'),
+                           html.Div(id='my-output')])
+    return app
+
+
+def test_div_outext():
+    # 11_dash_II: the box starts empty and is None once cleared
+    @transform_callback(_app(), Output('outext', 'children'), Input('inum', 'value'),
+                        js=TIMES_TWO_JS,
+                        cases=[('',), (None,), (0,), (1,), (21,), (2.5,), (0.5,), (-0.1,), (1e6,)])
+    def div_outext(num):
+        if num is None:
+            return 'times two: '
+        return f'times two: {num*2}'
+
+    assert div_outext.clientside
+    assert check_transform(div_outext) == []
+
+
+def test_update_output_div():
+    # 09_dash_II: a text box starting with 'initial value'
+    @transform_callback(_app(), Output('my-output', 'children'), Input('my-input', 'value'),
+                        js="function(input_value) { return 'Output: ' + input_value; }",
+                        cases=[('initial value',), ('',), ('Grüße',), ('42',)])
+    def update_output_div(input_value):
+        return f'Output: {input_value}'
+
+    assert check_transform(update_output_div) == []
+
+
+def test_mismatches_are_reported():
+    def div_outext(num):
+        return f'times two: {num*2}'
+
+    naive = "function(num) { return 'times two: ' + num * 2; }"
+    mismatches = compare_callback(div_outext, naive, [('',), (None,), (1,), (2.5,)])
+    assert [args for args, _, _ in mismatches] == [('',), (None,), (2.5,)]
+    assert mismatches[0][1:] == ({'ok': True, 'value': 'times two: '}, {'ok': True, 'value': 'times two: 0'})
+    assert mismatches[1][1]['ok'] is False and mismatches[1][2]['ok'] is True
+
+
+def test_without_js_the_python_function_is_served():
+    app = _app()
+
+    @transform_callback(app, Output('outext', 'children'), Input('inum', 'value'))
+    def div_outext(num):
+        return f'times two: {num*2}'
+
+    assert not div_outext.clientside
+    assert 'outext.children' in app.callback_map
+    with pytest.raises(ValueError):
+        check_transform(div_outext)
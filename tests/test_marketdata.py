@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+from reporting.marketdata import ACTIONS, COLUMNS, FakeProvider, MarketStore
+
+T = pd.Timestamp
+
+
+def _store(**kwargs):
+    provider = FakeProvider(**kwargs)
+    return MarketStore(':memory:', provider=provider), provider
+
+
+def test_only_gaps_are_fetched():
+    store, provider = _store()
+    store.history('MSFT', '2020-03-01', '2020-06-01')
+    store.history('MSFT', '2020-01-01', '2020-09-01')
+    assert provider.calls == [('MSFT', T('2020-03-01'), T('2020-06-01')),
+                              ('MSFT', T('2020-01-01'), T('2020-03-01')),
+                              ('MSFT', T('2020-06-01'), T('2020-09-01'))]
+    assert store.coverage('MSFT') == [(T('2020-01-01'), T('2020-09-01'))]
+
+
+def test_repeated_range_is_answered_from_disk():
+    store, provider = _store()
+    first = store.history('AMD', '2021-01-01', '2021-07-01')
+    second = store.history('AMD', '2021-02-01', '2021-03-01')
+    assert len(provider.calls) == 1
+    pd.testing.assert_frame_equal(second, first.loc['2021-02-01':'2021-02-28'])
+    assert list(first.columns) == COLUMNS + ACTIONS
+
+
+def test_bars_match_a_single_fetch():
+    store, provider = _store()
+    for start, end in [('2020-05-01', '2020-06-01'), ('2020-01-01', '2020-12-01')]:
+        bars = store.history('AAPL', start, end)
+    fresh = provider.fetch('AAPL', T('2020-01-01'), T('2020-12-01'))
+    np.testing.assert_allclose(bars[COLUMNS].to_numpy(), fresh[COLUMNS].to_numpy())
+
+
+def test_new_split_refetches_the_symbol():
+    store, provider = _store()
+    store.history('MSFT', '2020-01-01', '2020-06-01')
+    store.history('AMD', '2020-01-01', '2020-06-01')
+    provider.splits = {T('2020-08-03'): 2.0}
+
+    bars = store.history('MSFT', '2020-01-01', '2020-12-01')
+    assert provider.calls[2:] == [('MSFT', T('2020-06-01'), T('2020-12-01')),
+                                  ('MSFT', T('2020-01-01'), T('2020-12-01'))]
+    fresh = provider.fetch('MSFT', T('2020-01-01'), T('2020-12-01'))
+    np.testing.assert_allclose(bars[COLUMNS].to_numpy(), fresh[COLUMNS].to_numpy())
+    assert bars['Stock Splits'].sum() == 2.0
+    assert store.coverage('MSFT') == [(T('2020-01-01'), T('2020-12-01'))]
+    # other symbols keep their bars until they are asked for past the split
+    assert store.coverage('AMD') == [(T('2020-01-01'), T('2020-06-01'))]
+
+
+def test_split_before_the_stored_bars_needs_no_refetch():
+    store, provider = _store(splits={'2019-06-03': 4.0})
+    store.history('AAPL', '2020-01-01', '2020-06-01')
+    store.history('AAPL', '2019-01-01', '2020-06-01')
+    assert len(provider.calls) == 2